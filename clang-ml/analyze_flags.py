@@ -3,8 +3,8 @@
 Gradient-boosting analysis of which clang optimization flags actually matter
 for (a) runtime and (b) binary size, across the collected benchmark dataset.
 
-Data: clang-ml/lrndata/*.json  -- each record is one random flag configuration
-tested on 16 projects (~93 benchmark binaries), measuring `seconds` and `bytes`.
+Data: clang-ml/lrndata/*.json, *.jsonl, *.npz, *.parquet  -- each record is one
+random flag configuration tested on 16 projects (~93 benchmark binaries), measuring `seconds` and `bytes`.
 
 Because flags were sampled randomly and independently per category, the dataset
 is effectively a randomized experiment: model-free "flag on vs off" contrasts
@@ -18,7 +18,7 @@ Outputs:
 
 import os
 import re
-import json
+import sys
 import glob
 import importlib.util
 import warnings
@@ -47,6 +47,8 @@ PLOTDIR = os.path.join(OUTDIR, "plots")
 os.makedirs(PLOTDIR, exist_ok=True)
 
 RUNTIME_MIN_SECONDS = 0.05  # ignore sub-50ms benches: overhead-dominated, pure noise
+                            # (unless timed in-process, without the overhead)
+CI_FLOOR = 0.005  # relative CI below this is not trusted to be that precise
 
 # ----------------------------------------------------------------------------
 # 1. Load data + flag vocabulary
@@ -59,60 +61,70 @@ def load_flag_vocab():
 
 
 def load_dataset():
-    data = []
-    for fn in sorted(glob.glob(os.path.join(HERE, "lrndata", "*.json"))):
-        data += json.load(open(fn))
+    # raw get-data output (.json / .jsonl) or its columnar export (.npz /
+    # .parquet, the .flags.parquet sidecar is read with it)
+    sys.path.insert(0, HERE)
+    from dataset_store import load_tables
+
+    files = [fn for ext in ("json", "jsonl", "npz", "parquet")
+             for fn in glob.glob(os.path.join(HERE, "lrndata", f"*.{ext}"))
+             if not fn.endswith(".flags.parquet")]
     # all flag strings are unique across files (verified), so just concatenate
-    return data
+    return load_tables(sorted(files))
 
 
 FLAG_VARIANTS = load_flag_vocab()
 FLAG2CAT = {f: c for c, fs in FLAG_VARIANTS.items() for f in fs}
 ALL_FLAGS = [f for fs in FLAG_VARIANTS.values() for f in fs]
-data = load_dataset()
-print(f"Loaded {len(data)} flag configurations")
+config_flags, long = load_dataset()
+print(f"Loaded {len(config_flags)} flag configurations")
 
 # ----------------------------------------------------------------------------
 # 2. Build feature matrix (one binary column per individual flag) and the
 #    per-(config, bench) long table of measurements.
 # ----------------------------------------------------------------------------
 feat_rows = []
-long_rows = []
-for ci, entry in enumerate(data):
-    flags = set(entry["flags"].split())
+for flags in config_flags:
+    flags = set(flags.split())
     feat_rows.append({f: int(f in flags) for f in ALL_FLAGS})
-    for proj, blist in entry["results"].items():
-        for b in blist:
-            long_rows.append(
-                dict(config=ci, project=proj, bench=f"{proj}/{b['bench']}",
-                     seconds=b["seconds"], bytes=b["bytes"])
-            )
 
 X = pd.DataFrame(feat_rows)
 X = X.loc[:, X.sum() > 0]                       # drop flags never used (Ofast, etc.)
 FLAGS = list(X.columns)
 print(f"Usable flags (non-constant): {len(FLAGS)}")
 
-long = pd.DataFrame(long_rows)
-
 # ----------------------------------------------------------------------------
 # 3. Targets: per-benchmark log-normalised, then averaged per config.
 #    target[c] = mean_b ( log m[c,b] - mean_c log m[c,b] )  = log geomean ratio.
 #    Negative => faster / smaller than the typical config.
+#    With weighted=True each (config, bench) counts by inverse variance of its
+#    log time, 1/ci^2 (ci = relative CI half-width of the median, ~ the std
+#    error of log m), so noisy measurements pull the score less. Rows from
+#    before the adaptive sampler (no ci) get the median weight.
 # ----------------------------------------------------------------------------
-def per_config_score(df, value_col, bench_keep=None):
+def per_config_score(df, value_col, bench_keep=None, weighted=False):
     d = df if bench_keep is None else df[df.bench.isin(bench_keep)]
     d = d.assign(logv=np.log(d[value_col]))
-    d["rel"] = d.logv - d.groupby("bench")["logv"].transform("mean")
-    return d.groupby("config")["rel"].mean()
+    # process, region and spawn timings of a bench are on different scales
+    by = ["bench", "timing"] if "timing" in d else "bench"
+    d["rel"] = d.logv - d.groupby(by)["logv"].transform("mean")
+    if not weighted or "ci" not in d or d["ci"].isna().all():
+        return d.groupby("config")["rel"].mean()
+    w = 1.0 / np.maximum(d["ci"], CI_FLOOR) ** 2
+    d["w"] = w.fillna(w.median())
+    d["wrel"] = d.rel * d.w
+    g = d.groupby("config")
+    return g["wrel"].sum() / g["w"].sum()
 
 
 bench_med = long.groupby("bench")["seconds"].median()
-runtime_benches = sorted(bench_med[bench_med >= RUNTIME_MIN_SECONDS].index)
-print(f"Runtime benches >= {RUNTIME_MIN_SECONDS}s: {len(runtime_benches)} "
+in_process = long.assign(r=long.timing == "region").groupby("bench")["r"].all()
+runtime_benches = sorted(bench_med[(bench_med >= RUNTIME_MIN_SECONDS) | in_process].index)
+print(f"Runtime benches >= {RUNTIME_MIN_SECONDS}s or in-process: {len(runtime_benches)} "
       f"(of {long.bench.nunique()}); size uses all binaries")
 
-y_rt = per_config_score(long, "seconds", runtime_benches).reindex(X.index).values
+y_rt = per_config_score(long, "seconds", runtime_benches, weighted=True)
+y_rt = y_rt.reindex(X.index).values
 y_sz = per_config_score(long, "bytes").reindex(X.index).values
 
 TARGETS = {
@@ -381,7 +393,7 @@ tab.to_csv(os.path.join(OUTDIR, "flag_effects.csv"), index=False)
 
 with open(os.path.join(OUTDIR, "flag_effects.md"), "w") as f:
     f.write("# Compiler-flag importance — gradient boosting analysis\n\n")
-    f.write(f"- {len(data)} random flag configurations, {len(FLAGS)} varied flags, "
+    f.write(f"- {len(config_flags)} random flag configurations, {len(FLAGS)} varied flags, "
             f"{long.bench.nunique()} benchmark binaries across 16 projects.\n")
     for name in ["runtime", "size"]:
         ev = RESULTS[name]["ev"]
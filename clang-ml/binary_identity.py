@@ -0,0 +1,136 @@
+"""
+Pools benchmark samples across flag sets that produce the same binary.
+
+Many random flag sets only differ in flags with no effect on a project's
+code (-fstrict-vtable-pointers on C, -mtune=native next to -march=native),
+so their bench executables are identical. A binary is identified by its
+loaded image: the allocated ELF sections (.text, .data, .rodata, ...; not
+symbols, debug info or the build-id note) together with the bytes of any
+other file the bench reads. Timings are kept per (bench, image) in a store
+shared by all configurations, so an identical binary reuses the samples
+measured earlier, and the pool grows only when the sampler still needs runs.
+
+  CLANG_ML_SAMPLES_DIR  sample store; unset measures everything as before
+"""
+
+import contextlib
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+SHF_ALLOC = 0x2
+SHT_NOBITS = 8
+SHT_NOTE = 7
+
+
+def _elf_image(data: bytes) -> bytes:
+    # section headers only, no external tools; (name offset, type, flags,
+    # addr, offset, size) from Elf32_Shdr / Elf64_Shdr
+    is64 = data[4] == 2
+    end = "<" if data[5] == 1 else ">"
+    if is64:
+        (shoff,) = struct.unpack_from(end + "Q", data, 0x28)
+        shentsize, shnum, shstrndx = struct.unpack_from(end + "HHH", data, 0x3A)
+        fmt = end + "IIQQQQ"
+    else:
+        (shoff,) = struct.unpack_from(end + "I", data, 0x20)
+        shentsize, shnum, shstrndx = struct.unpack_from(end + "HHH", data, 0x2E)
+        fmt = end + "IIIIII"
+    headers = [
+        struct.unpack_from(fmt, data, shoff + i * shentsize) for i in range(shnum)
+    ]
+    strtab = headers[shstrndx][4] if shnum else 0
+    h = hashlib.sha256()
+    for name, kind, flags, addr, offset, size in headers:
+        if not flags & SHF_ALLOC or kind == SHT_NOTE:
+            continue
+        label = data[strtab + name : data.index(b"\0", strtab + name)]
+        h.update(struct.pack("<QQQ", kind, addr, size) + label + b"\0")
+        if kind != SHT_NOBITS:
+            h.update(data[offset : offset + size])
+    return h.digest()
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str, size: int, mtime_ns: int) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] == b"\x7fELF":
+        try:
+            return _elf_image(data)
+        except (struct.error, IndexError, ValueError):
+            pass
+    return hashlib.sha256(data).digest()
+
+
+def image_digest(files: Sequence[Path]) -> str:
+    h = hashlib.sha256()
+    for path in files:
+        st = os.stat(path)
+        h.update(_file_digest(os.path.realpath(path), st.st_size, st.st_mtime_ns))
+    return h.hexdigest()
+
+
+class Samples:
+    """Timings of one bench, pooled over every identical build of it.
+
+    samples() returns what is already known and save(timings, meta) stores
+    the new ones (timings = samples() + fresh runs) and replaces the meta
+    data (how the bench was timed, per-phase ns/op), which `meta` holds
+    for a bench that is not run again.
+    """
+
+    def __init__(self, bench: str, files: Sequence[Path]):
+        root = os.environ.get("CLANG_ML_SAMPLES_DIR")
+        self.path = None
+        self.known: List[float] = []
+        self.meta: Dict[str, Any] = {}
+        if not root:
+            return
+        self.digest = image_digest(files)
+        key = hashlib.sha256(f"{bench}\0{self.digest}".encode()).hexdigest()
+        self.path = Path(root) / f"{key}.json"
+        self.bench = bench
+        with self._lock(fcntl.LOCK_SH):
+            if self.path.exists():
+                record = json.loads(self.path.read_text())
+                self.known = record["samples"]
+                self.meta = record.get("meta", {})
+        if self.known:
+            print(
+                f"[*] {bench}: identical binary measured before "
+                f"({len(self.known)} samples, image {self.digest[:12]})"
+            )
+
+    @contextlib.contextmanager
+    def _lock(self, mode: int):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "w") as f:
+            fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def samples(self) -> List[float]:
+        return list(self.known)
+
+    def save(self, timings: Sequence[float], meta: Dict[str, Any]):
+        fresh = list(timings[len(self.known) :])
+        if self.path is None or not fresh:
+            return
+        with self._lock(fcntl.LOCK_EX):
+            # another configuration may have added samples meanwhile
+            stored = []
+            if self.path.exists():
+                stored = json.loads(self.path.read_text())["samples"]
+            record = {"bench": self.bench, "image": self.digest, "meta": meta}
+            record["samples"] = stored + fresh
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(record))
+            os.replace(tmp, self.path)
@@ -0,0 +1,241 @@
+"""
+Content-addressed cache of built benchmark artifacts.
+
+An entry holds the bench executables (and any directories they need at run
+time, e.g. an install prefix with shared libraries) of one build, stored
+under sha256(project, content of the source trees, clang --version, flags,
+the build recipe). The recipe is this module plus the files that drive the
+build (the project's build_and_test.py, the harness sources), so changing
+how a project is built misses every entry built the old way.
+A repeated configuration, or a dependency built without the sampled flags,
+is restored by copying instead of rebuilt. Entries are evicted least
+recently used first once the cache exceeds its size limit.
+
+  CLANG_ML_CACHE_DIR    cache root; unset disables caching
+  CLANG_ML_CACHE_BYTES  size limit (default 20 GiB)
+
+Several build_and_test.py processes share one cache: entries are published
+by an atomic rename and eviction takes an exclusive lock that readers hold
+shared while copying an entry out.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from flag_oracle import clang_version
+
+DEFAULT_MAX_BYTES = 20 << 30
+
+
+def _stat_digest(root: Path) -> str:
+    h = hashlib.sha256()
+    for path in _walk(root):
+        st = path.lstat()
+        h.update(f"{path.relative_to(root)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _walk(root: Path) -> Iterator[Path]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != ".git")
+        for name in sorted(filenames):
+            yield Path(dirpath) / name
+
+
+def _content_digest(root: Path) -> str:
+    h = hashlib.sha256()
+    for path in _walk(root):
+        h.update(f"{path.relative_to(root)}\0".encode())
+        if path.is_symlink():
+            h.update(os.readlink(path).encode())
+        else:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _tree_size(root: Path) -> int:
+    return sum(p.lstat().st_size for p in _walk(root))
+
+
+def _is_elf(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4) == b"\x7fELF"
+
+
+class BuildCache:
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.entries = self.root / "entries"
+        self.trees = self.root / "trees"
+        for d in (self.entries, self.trees, self.root / "tmp"):
+            d.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["BuildCache"]:
+        root = os.environ.get("CLANG_ML_CACHE_DIR")
+        if not root:
+            return None
+        return cls(root, int(os.environ.get("CLANG_ML_CACHE_BYTES", DEFAULT_MAX_BYTES)))
+
+    @contextlib.contextmanager
+    def _lock(self, mode: int):
+        with open(self.root / "lock", "w") as f:
+            fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def tree_hash(self, root: Path) -> str:
+        # Hashing a full source tree on every build is the slow part, so the
+        # content hash is remembered against a cheap (path, size, mtime)
+        # digest and recomputed only when something was touched.
+        root = Path(root).resolve()
+        memo = self.trees / (hashlib.sha256(str(root).encode()).hexdigest() + ".json")
+        stat = _stat_digest(root)
+        try:
+            cached = json.loads(memo.read_text())
+            if cached["stat"] == stat:
+                return cached["content"]
+        except (OSError, ValueError, KeyError):
+            pass
+        content = _content_digest(root)
+        tmp = memo.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"stat": stat, "content": content}))
+        os.replace(tmp, memo)
+        return content
+
+    def key(
+        self,
+        project: str,
+        inputs: Sequence[Path],
+        clang: str,
+        flags: Sequence[str],
+        recipe: Sequence[Path] = (),
+    ) -> str:
+        h = hashlib.sha256()
+        h.update(f"{project}\0{clang_version(clang)}\0{' '.join(flags)}\0".encode())
+        for root in inputs:
+            h.update(self.tree_hash(root).encode())
+        for path in [Path(__file__), *recipe]:
+            h.update(f"{Path(path).name}\0{_file_digest(path)}\0".encode())
+        return h.hexdigest()
+
+    def restore(
+        self, key: str, dest: Path, dirs: Sequence[Path] = ()
+    ) -> Optional[List[Path]]:
+        entry = self.entries / key
+        with self._lock(fcntl.LOCK_SH):
+            manifest = entry / "manifest.json"
+            if not manifest.exists():
+                return None
+            meta = json.loads(manifest.read_text())
+            for i, target in enumerate(dirs):
+                shutil.rmtree(target, ignore_errors=True)
+                shutil.copytree(entry / "dirs" / str(i), target, symlinks=True)
+            dest.mkdir(parents=True, exist_ok=True)
+            executables = []
+            for name in meta["executables"]:
+                shutil.copy2(entry / "bin" / name, dest / name)
+                executables.append(dest / name)
+            # mtime of the manifest is the LRU clock
+            os.utime(manifest)
+        return executables
+
+    def store(self, key: str, executables: Sequence[Path], dirs: Sequence[Path] = ()):
+        names = [p.name for p in executables]
+        if len(set(names)) != len(names) or not all(_is_elf(p) for p in executables):
+            # wrapper scripts (libtool) point into the build tree and would
+            # not survive being copied out of it
+            print("[*] Build cache: artifacts are not relocatable, not stored")
+            return
+        tmp = self.root / "tmp" / f"{key}.{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        (tmp / "bin").mkdir(parents=True)
+        for exe in executables:
+            shutil.copy2(exe, tmp / "bin" / exe.name)
+        for i, d in enumerate(dirs):
+            shutil.copytree(d, tmp / "dirs" / str(i), symlinks=True)
+        meta = {"executables": names, "bytes": _tree_size(tmp), "created": time.time()}
+        (tmp / "manifest.json").write_text(json.dumps(meta))
+        with self._lock(fcntl.LOCK_EX):
+            try:
+                os.rename(tmp, self.entries / key)
+            except OSError:
+                # another process published the same build first
+                shutil.rmtree(tmp, ignore_errors=True)
+            self._evict(keep=key)
+
+    def _evict(self, keep: str):
+        entries = []
+        for entry in self.entries.iterdir():
+            manifest = entry / "manifest.json"
+            try:
+                meta = json.loads(manifest.read_text())
+                entries.append((manifest.stat().st_mtime, meta["bytes"], entry))
+            except (OSError, ValueError, KeyError):
+                shutil.rmtree(entry, ignore_errors=True)
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            print(f"[*] Build cache: evicting {entry.name[:12]} ({size} bytes)")
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def cached_build(
+    project: str,
+    inputs: Sequence[Path],
+    clang: str,
+    flags: Sequence[str],
+    build: Callable[[], Optional[List[Path]]],
+    dest: Path,
+    dirs: Sequence[Path] = (),
+    relocatable: bool = True,
+    recipe: Sequence[Path] = (),
+) -> List[Path]:
+    """Runs build() unless an identical build is cached.
+
+    build() returns the bench executables (or None for a dependency that
+    only fills dirs); on a hit they are copied into dest and dirs are
+    restored in place. Installs that embed their prefix (pkg-config files,
+    *-config scripts used by a later build) pass relocatable=False and are
+    only reused at the same location. recipe lists the files that define
+    how build() builds (see Project.recipe_files()); they are part of the key.
+    """
+    cache = BuildCache.from_env()
+    if cache is None:
+        return build() or []
+    inputs = [Path(p) for p in inputs if Path(p).exists()]
+    if not relocatable:
+        project += "@" + ":".join(str(Path(d).resolve()) for d in dirs)
+    key = cache.key(project, inputs, clang, flags, recipe)
+    executables = cache.restore(key, Path(dest), dirs)
+    if executables is not None:
+        print(f"[*] Build cache hit for {project} ({key[:12]})")
+        return executables
+    executables = build() or []
+    cache.store(key, executables, dirs)
+    return executables
@@ -1,7 +1,7 @@
+#include <bench.h>
 #include <avl-tree.h>
 #include <stdlib.h>
 #include <stdio.h>
-#include <time.h>
 
 static int
 cmp(void *a, void *b)
@@ -23,19 +23,18 @@ main(void)
 	for (int i = 0; i < N; ++i)
 		vals[i] = i;
 
-	clock_t t0 = clock();
-	for (int i = 0; i < N; ++i)
-		avl_tree_insert(tree, &vals[i], &vals[i]);
-	clock_t t1 = clock();
-
-	for (int i = 0; i < N; ++i)
-		if (avl_tree_lookup(tree, &vals[i]) == NULL)
-			return 1;
-	clock_t t2 = clock();
+	BENCH_ONCE("insert", N)
+	{
+		for (int i = 0; i < N; ++i)
+			avl_tree_insert(tree, &vals[i], &vals[i]);
+	}
 
-	printf("avl_insert=%f lookup=%f\n",
-	       (double)(t1 - t0) / CLOCKS_PER_SEC,
-	       (double)(t2 - t1) / CLOCKS_PER_SEC);
+	BENCH_LOOP("lookup", N)
+	{
+		for (int i = 0; i < N; ++i)
+			if (avl_tree_lookup(tree, &vals[i]) == NULL)
+				return 1;
+	}
 
 	avl_tree_free(tree);
 	free(vals);
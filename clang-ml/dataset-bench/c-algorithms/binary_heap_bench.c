@@ -1,7 +1,7 @@
+#include <bench.h>
 #include <binary-heap.h>
 #include <stdlib.h>
 #include <stdio.h>
-#include <time.h>
 
 static int
 int_cmp(void *a, void *b)
@@ -24,19 +24,18 @@ main(void)
 	for (int i = 0; i < N; ++i)
 		vals[i] = rand();
 
-	clock_t t0 = clock();
-	for (int i = 0; i < N; ++i)
-		binary_heap_insert(h, &vals[i]);
-	clock_t t1 = clock();
-
-	for (int i = 0; i < N; ++i)
-		if (binary_heap_pop(h) == NULL)
-			return 1;
-	clock_t t2 = clock();
+	BENCH_ONCE("insert", N)
+	{
+		for (int i = 0; i < N; ++i)
+			binary_heap_insert(h, &vals[i]);
+	}
 
-	printf("binary_heap_insert=%f pop=%f\n",
-	       (double)(t1 - t0) / CLOCKS_PER_SEC,
-	       (double)(t2 - t1) / CLOCKS_PER_SEC);
+	BENCH_ONCE("pop", N)
+	{
+		for (int i = 0; i < N; ++i)
+			if (binary_heap_pop(h) == NULL)
+				return 1;
+	}
 
 	binary_heap_free(h);
 	free(vals);
@@ -1,7 +1,7 @@
+#include <bench.h>
 #include <hash-table.h>
 #include <stdlib.h>
 #include <stdio.h>
-#include <time.h>
 #include <string.h>
 
 static unsigned
@@ -33,19 +33,18 @@ main(void)
 		sprintf(keys[i], "k%07d", i);
 	}
 
-	clock_t t0 = clock();
-	for (int i = 0; i < N; ++i)
-		hash_table_insert(ht, keys[i], keys[i]);
-	clock_t t1 = clock();
-
-	for (int i = 0; i < N; ++i)
-		if (!hash_table_lookup(ht, keys[i]))
-			return 1;
-	clock_t t2 = clock();
+	BENCH_ONCE("insert", N)
+	{
+		for (int i = 0; i < N; ++i)
+			hash_table_insert(ht, keys[i], keys[i]);
+	}
 
-	printf("hash_insert=%f lookup=%f\n",
-	       (double)(t1 - t0) / CLOCKS_PER_SEC,
-	       (double)(t2 - t1) / CLOCKS_PER_SEC);
+	BENCH_LOOP("lookup", N)
+	{
+		for (int i = 0; i < N; ++i)
+			if (!hash_table_lookup(ht, keys[i]))
+				return 1;
+	}
 
 	hash_table_free(ht);
 	for (int i = 0; i < N; ++i)
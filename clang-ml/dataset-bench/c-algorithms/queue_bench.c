@@ -1,7 +1,7 @@
+#include <bench.h>
 #include <queue.h>
 #include <stdlib.h>
 #include <stdio.h>
-#include <time.h>
 #include <stdint.h>
 
 int
@@ -12,19 +12,18 @@ main(void)
 	if (!q)
 		return 1;
 
-	clock_t t0 = clock();
-	for (int i = 0; i < N; ++i)
-		queue_push_tail(q, (void *)(intptr_t)i);
-	clock_t   t1  = clock();
+	BENCH_ONCE("push", N)
+	{
+		for (int i = 0; i < N; ++i)
+			queue_push_tail(q, (void *)(intptr_t)i);
+	}
 
 	long long sum = 0;
-	while (!queue_is_empty(q))
-		sum += (intptr_t)queue_pop_head(q);
-	clock_t t2 = clock();
-
-	printf("queue_push=%f pop=%f\n",
-	       (double)(t1 - t0) / CLOCKS_PER_SEC,
-	       (double)(t2 - t1) / CLOCKS_PER_SEC);
+	BENCH_ONCE("pop", N)
+	{
+		while (!queue_is_empty(q))
+			sum += (intptr_t)queue_pop_head(q);
+	}
 
 	queue_free(q);
 	return sum > 0 ? 0 : 1;
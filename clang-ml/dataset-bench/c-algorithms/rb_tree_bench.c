@@ -1,7 +1,7 @@
+#include <bench.h>
 #include <rb-tree.h>
 #include <stdlib.h>
 #include <stdio.h>
-#include <time.h>
 
 static int
 int_cmp(void *a, void *b)
@@ -23,19 +23,18 @@ main(void)
 	for (int i = 0; i < N; ++i)
 		vals[i] = i;
 
-	clock_t t0 = clock();
-	for (int i = 0; i < N; ++i)
-		rb_tree_insert(t, &vals[i], &vals[i]);
-	clock_t t1 = clock();
-
-	for (int i = 0; i < N; ++i)
-		if (rb_tree_lookup(t, &vals[i]) == NULL)
-			return 1;
-	clock_t t2 = clock();
+	BENCH_ONCE("insert", N)
+	{
+		for (int i = 0; i < N; ++i)
+			rb_tree_insert(t, &vals[i], &vals[i]);
+	}
 
-	printf("rb_tree_insert=%f lookup=%f\n",
-	       (double)(t1 - t0) / CLOCKS_PER_SEC,
-	       (double)(t2 - t1) / CLOCKS_PER_SEC);
+	BENCH_LOOP("lookup", N)
+	{
+		for (int i = 0; i < N; ++i)
+			if (rb_tree_lookup(t, &vals[i]) == NULL)
+				return 1;
+	}
 
 	rb_tree_free(t);
 	free(vals);
@@ -1,8 +1,8 @@
+#include <bench.h>
 #include <trie.h>
 #include <stdlib.h>
 #include <stdio.h>
 #include <string.h>
-#include <time.h>
 
 int
 main(void)
@@ -18,19 +18,18 @@ main(void)
 		sprintf(words[i], "word%07d", i);
 	}
 
-	clock_t t0 = clock();
-	for (int i = 0; i < N; ++i)
-		trie_insert(trie, words[i], words[i]);
-	clock_t t1 = clock();
-
-	for (int i = 0; i < N; ++i)
-		if (!trie_lookup(trie, words[i]))
-			return 1;
-	clock_t t2 = clock();
+	BENCH_ONCE("insert", N)
+	{
+		for (int i = 0; i < N; ++i)
+			trie_insert(trie, words[i], words[i]);
+	}
 
-	printf("trie_insert=%f lookup=%f\n",
-	       (double)(t1 - t0) / CLOCKS_PER_SEC,
-	       (double)(t2 - t1) / CLOCKS_PER_SEC);
+	BENCH_LOOP("lookup", N)
+	{
+		for (int i = 0; i < N; ++i)
+			if (!trie_lookup(trie, words[i]))
+				return 1;
+	}
 
 	for (int i = 0; i < N; ++i)
 		free(words[i]);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "cJSON.h"
 #include <stdio.h>
 
@@ -7,12 +8,15 @@
 int
 main(void)
 {
-	for (int i = 0; i < ITER; ++i) {
-		cJSON *arr = cJSON_CreateIntArray(NULL, 0);
-		for (int n = 0; n < ARR; ++n) {
-			cJSON_AddItemToArray(arr, cJSON_CreateNumber(n));
+	BENCH_LOOP("build_array", ITER)
+	{
+		for (int i = 0; i < ITER; ++i) {
+			cJSON *arr = cJSON_CreateIntArray(NULL, 0);
+			for (int n = 0; n < ARR; ++n) {
+				cJSON_AddItemToArray(arr, cJSON_CreateNumber(n));
+			}
+			cJSON_Delete(arr);
 		}
-		cJSON_Delete(arr);
 	}
 	return 0;
 }
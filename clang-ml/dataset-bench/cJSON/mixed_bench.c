@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "cJSON.h"
 #include <stdio.h>
 #include <stdlib.h>
@@ -11,14 +12,17 @@ main(void)
 	        = "{\"x\":%d,\"y\":%d,\"label\":\"point\",\"meta\":{\"valid\":true}}";
 
 	char buf[128];
-	for (int i = 0; i < ITER; ++i) {
-		snprintf(buf, sizeof(buf), templ, i, ITER - i);
-		cJSON *pt = cJSON_Parse(buf);
-		cJSON_ReplaceItemInObject(pt, "label",
-		                          cJSON_CreateString("point-updated"));
-		char *printed = cJSON_PrintUnformatted(pt);
-		free(printed);
-		cJSON_Delete(pt);
+	BENCH_LOOP("parse_update_print", ITER)
+	{
+		for (int i = 0; i < ITER; ++i) {
+			snprintf(buf, sizeof(buf), templ, i, ITER - i);
+			cJSON *pt = cJSON_Parse(buf);
+			cJSON_ReplaceItemInObject(pt, "label",
+			                          cJSON_CreateString("point-updated"));
+			char *printed = cJSON_PrintUnformatted(pt);
+			free(printed);
+			cJSON_Delete(pt);
+		}
 	}
 	return 0;
 }
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "cJSON.h"
 #include <stdio.h>
 
@@ -8,9 +9,12 @@ main(void)
 {
 	const char *json
 	        = "{\"name\":\"John\",\"age\":30,\"cars\":[\"Ford\",\"BMW\",\"Fiat\"]}";
-	for (int i = 0; i < ITER; ++i) {
-		cJSON *root = cJSON_Parse(json);
-		cJSON_Delete(root);
+	BENCH_LOOP("parse", ITER)
+	{
+		for (int i = 0; i < ITER; ++i) {
+			cJSON *root = cJSON_Parse(json);
+			cJSON_Delete(root);
+		}
 	}
 	return 0;
 }
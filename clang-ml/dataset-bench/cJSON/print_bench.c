@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "cJSON.h"
 #include <stdio.h>
 #include <stdlib.h>
@@ -11,9 +12,12 @@ main(void)
 	cJSON_AddStringToObject(root, "language", "C");
 	cJSON_AddNumberToObject(root, "year", 1972);
 
-	for (int i = 0; i < ITER; ++i) {
-		char *printed = cJSON_PrintUnformatted(root);
-		free(printed);
+	BENCH_LOOP("print", ITER)
+	{
+		for (int i = 0; i < ITER; ++i) {
+			char *printed = cJSON_PrintUnformatted(root);
+			free(printed);
+		}
 	}
 	cJSON_Delete(root);
 	return 0;
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "cJSON.h"
 #include <stdio.h>
 
@@ -12,14 +13,17 @@ main(void)
 	          "{\"id\":\"open\",\"label\":\"Open\"},"
 	          "{\"id\":\"close\",\"label\":\"Close\"}]}}";
 
-	for (int i = 0; i < ITER; ++i) {
-		cJSON *root = cJSON_Parse(json);
-		cJSON *item = NULL;
-		cJSON_ArrayForEach(item, root)
-		{
-			(void)item;
+	BENCH_LOOP("parse_traverse", ITER)
+	{
+		for (int i = 0; i < ITER; ++i) {
+			cJSON *root = cJSON_Parse(json);
+			cJSON *item = NULL;
+			cJSON_ArrayForEach(item, root)
+			{
+				(void)item;
+			}
+			cJSON_Delete(root);
 		}
-		cJSON_Delete(root);
 	}
 	return 0;
 }
@@ -1,4 +0,0 @@
-import subprocess
-
-for _ in range(500):
-    subprocess.run(["./cat", "small.txt"], stdout=subprocess.DEVNULL)
@@ -0,0 +1 @@
+-n 500 -- ./cat small.txt
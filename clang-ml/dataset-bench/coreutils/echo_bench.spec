@@ -0,0 +1 @@
+-n 10000 -- ./echo hello world
@@ -0,0 +1 @@
+-n 500 -- ./head -n 10 large.txt
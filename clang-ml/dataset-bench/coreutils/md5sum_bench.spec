@@ -0,0 +1 @@
+-n 100 -- ./md5sum medium.bin
@@ -0,0 +1 @@
+-n 50 -- ./sort numbers.txt
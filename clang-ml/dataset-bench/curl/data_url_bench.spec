@@ -0,0 +1 @@
+-n 500 -- ./curl -s data:text/plain;base64,aGVsbG8gd29ybGQK
@@ -0,0 +1 @@
+-n 1000 -- ./curl -sI file://{cwd}/test.txt
@@ -0,0 +1 @@
+-n 1000 -- ./curl -s file://{cwd}/test.txt
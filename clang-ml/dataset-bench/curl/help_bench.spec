@@ -0,0 +1 @@
+-n 100 -- ./curl --help
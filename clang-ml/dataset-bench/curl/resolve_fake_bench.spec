@@ -0,0 +1,2 @@
+# no server listens, curl exits with an error every time
+-n 100 -q -- ./curl -s --resolve fake.local:80:127.0.0.1 http://fake.local
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <glib.h>
 
 static gint
@@ -20,9 +21,15 @@ int
 main(void)
 {
 	GTree *t = g_tree_new(int_compare);
-	for (gint i = 0; i < 5000; i++)
-		g_tree_insert(t, GINT_TO_POINTER(i), GINT_TO_POINTER(i + 1));
-	g_tree_foreach(t, visit_node, NULL);
+	BENCH_ONCE("insert", 5000)
+	{
+		for (gint i = 0; i < 5000; i++)
+			g_tree_insert(t, GINT_TO_POINTER(i), GINT_TO_POINTER(i + 1));
+	}
+	BENCH_LOOP("foreach", 5000)
+	{
+		g_tree_foreach(t, visit_node, NULL);
+	}
 	g_tree_destroy(t);
 	return 0;
 }
@@ -0,0 +1,107 @@
+/*
+ * In-process timing for the dataset-bench *_bench.c programs.
+ *
+ * Timing the whole process also measures fork/exec, dynamic loading and
+ * setup (filling a database, generating keys), none of which depends on the
+ * flags under test. A bench marks what it measures instead:
+ *
+ *	BENCH_ONCE("insert", N) {		// runs exactly once
+ *		for (int i = 0; i < N; ++i)
+ *			tree_insert(t, i);
+ *	}
+ *	BENCH_LOOP("lookup", N) {		// repeated, body must be idempotent
+ *		for (int i = 0; i < N; ++i)
+ *			bench_escape(tree_lookup(t, i));
+ *	}
+ *
+ * BENCH_LOOP repeats its body until BENCH_MIN_NS (environment, default
+ * 50 ms) have passed, so short regions are not dominated by clock
+ * resolution. Each region prints one line to stdout:
+ *
+ *	@bench phase=<name> ns_per_op=<f> ops=<n> iters=<k> ns=<f>
+ *
+ * where ns is the time of one pass over the region. The harness
+ * (clang-ml/harness) sums ns over the phases of a run and reports that as
+ * the bench's seconds, and ns_per_op per phase.
+ *
+ * Include bench.h before any other header. Under a strict -std=c99/c11 the
+ * C library hides clock_gettime() unless a POSIX level is requested before
+ * its first header is read, and bench.h requests one.
+ */
+#ifndef CLANG_ML_BENCH_H
+#define CLANG_ML_BENCH_H
+
+/* only in strict ISO mode: anywhere else it would hide the default
+ * BSD/GNU extensions the benches may rely on */
+#if defined(__STRICT_ANSI__) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 199309L
+#endif
+
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+
+#ifndef CLOCK_MONOTONIC
+#error "bench.h: no CLOCK_MONOTONIC; include bench.h first or build with -D_POSIX_C_SOURCE=199309L"
+#endif
+
+#define BENCH_MAX_ITERS (1LL << 20)
+
+/* keeps a value the compiler would otherwise prove unused */
+#define bench_escape(p) __asm__ volatile("" : : "g"(p) : "memory")
+
+struct bench_region {
+	const char *name;
+	long long   ops;
+	long long   iters;
+	long long   max_iters;
+	uint64_t    min_ns;
+	uint64_t    start;
+};
+
+static inline uint64_t
+bench_now(void)
+{
+	struct timespec ts;
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return (uint64_t)ts.tv_sec * 1000000000u + (uint64_t)ts.tv_nsec;
+}
+
+static inline struct bench_region
+bench_begin(const char *name, long long ops, long long max_iters)
+{
+	struct bench_region r = { name, ops > 0 ? ops : 1, 0, max_iters,
+		                  50000000u, 0 };
+	const char         *env = getenv("BENCH_MIN_NS");
+	if (env)
+		r.min_ns = strtoull(env, NULL, 10);
+	return r;
+}
+
+static inline int
+bench_next(struct bench_region *r)
+{
+	uint64_t now = bench_now();
+	if (r->iters == 0) {
+		r->start = now;
+	} else if (r->iters >= r->max_iters || now - r->start >= r->min_ns) {
+		double pass = (double)(now - r->start) / r->iters;
+		printf("@bench phase=%s ns_per_op=%.3f ops=%lld iters=%lld ns=%.0f\n",
+		       r->name, pass / r->ops, r->ops, r->iters, pass);
+		return 0;
+	}
+	r->iters++;
+	return 1;
+}
+
+#define BENCH_ONCE(name, ops)                                        \
+	for (struct bench_region bench_r_ = bench_begin((name), (ops), 1); \
+	     bench_next(&bench_r_);)
+
+#define BENCH_LOOP(name, ops)                                       \
+	for (struct bench_region bench_r_                               \
+	     = bench_begin((name), (ops), BENCH_MAX_ITERS);             \
+	     bench_next(&bench_r_);)
+
+#endif
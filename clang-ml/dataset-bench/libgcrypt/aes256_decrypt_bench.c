@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <gcrypt.h>
@@ -35,8 +36,11 @@ main()
 	if (gcry_cipher_setiv(dec_hd, iv, IV_LENGTH))
 		return 1;
 
-	if (gcry_cipher_decrypt(dec_hd, buffer, BUFFER_SIZE, NULL, 0))
-		return 1;
+	BENCH_LOOP("decrypt", BUFFER_SIZE)
+	{
+		if (gcry_cipher_decrypt(dec_hd, buffer, BUFFER_SIZE, NULL, 0))
+			return 1;
+	}
 
 	gcry_cipher_close(dec_hd);
 	free(buffer);
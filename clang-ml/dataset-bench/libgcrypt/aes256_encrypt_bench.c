@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <gcrypt.h>
@@ -28,8 +29,11 @@ main()
 	if (gcry_cipher_setiv(hd, iv, IV_LENGTH))
 		return 1;
 
-	if (gcry_cipher_encrypt(hd, buffer, BUFFER_SIZE, NULL, 0))
-		return 1;
+	BENCH_LOOP("encrypt", BUFFER_SIZE)
+	{
+		if (gcry_cipher_encrypt(hd, buffer, BUFFER_SIZE, NULL, 0))
+			return 1;
+	}
 
 	gcry_cipher_close(hd);
 	free(buffer);
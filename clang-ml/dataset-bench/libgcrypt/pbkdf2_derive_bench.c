@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <gcrypt.h>
 #include <string.h>
 
@@ -15,10 +16,13 @@ main()
 	const unsigned char salt[]   = "some-random-salt";
 	unsigned char       derived_key[KEY_LEN];
 
-	if (gcry_kdf_derive(password, strlen(password), GCRY_KDF_PBKDF2,
-	                    GCRY_MD_SHA512, salt, sizeof(salt) - 1, ITERATIONS,
-	                    KEY_LEN, derived_key)) {
-		return 1;
+	BENCH_LOOP("derive", ITERATIONS)
+	{
+		if (gcry_kdf_derive(password, strlen(password), GCRY_KDF_PBKDF2,
+		                    GCRY_MD_SHA512, salt, sizeof(salt) - 1,
+		                    ITERATIONS, KEY_LEN, derived_key)) {
+			return 1;
+		}
 	}
 
 	return 0;
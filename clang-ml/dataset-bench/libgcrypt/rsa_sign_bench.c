@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <gcrypt.h>
 #include <string.h>
 
@@ -30,14 +31,18 @@ main()
 	if (err)
 		return 1;
 
-	gcry_sexp_t signature;
-	err = gcry_pk_sign(&signature, data_to_sign, rsa_keypair);
-	if (err)
-		return 1;
+	// key generation draws random primes, its time says little about flags
+	BENCH_LOOP("sign", 1)
+	{
+		gcry_sexp_t signature;
+		err = gcry_pk_sign(&signature, data_to_sign, rsa_keypair);
+		if (err)
+			return 1;
+		gcry_sexp_release(signature);
+	}
 
 	gcry_sexp_release(rsa_keypair);
 	gcry_sexp_release(data_to_sign);
-	gcry_sexp_release(signature);
 
 	return 0;
 }
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <gcrypt.h>
 #include <string.h>
 
@@ -36,7 +37,10 @@ main()
 	if (err)
 		return 1;
 
-	err = gcry_pk_verify(signature, data_to_sign, rsa_keypair);
+	BENCH_LOOP("verify", 1)
+	{
+		err = gcry_pk_verify(signature, data_to_sign, rsa_keypair);
+	}
 
 	gcry_sexp_release(rsa_keypair);
 	gcry_sexp_release(data_to_sign);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <gcrypt.h>
@@ -25,8 +26,12 @@ main()
 
 	unsigned char digest[64];
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		gcry_md_hash_buffer(GCRY_MD_SHA512, digest, buffer, BUFFER_SIZE);
+	BENCH_LOOP("hash", (long long)LOOP_COUNT * BUFFER_SIZE)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			gcry_md_hash_buffer(GCRY_MD_SHA512, digest, buffer,
+			                    BUFFER_SIZE);
+		}
 	}
 
 	free(buffer);
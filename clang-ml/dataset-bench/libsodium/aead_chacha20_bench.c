@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sodium.h>
 #include <stdio.h>
 #include <stdlib.h>
@@ -24,9 +25,12 @@ main(void)
 
 	unsigned long long ciphertext_len;
 
-	crypto_aead_chacha20poly1305_ietf_encrypt(ciphertext, &ciphertext_len,
-	                                          message, MESSAGE_SIZE, NULL, 0,
-	                                          NULL, nonce, key);
+	BENCH_LOOP("encrypt", MESSAGE_SIZE)
+	{
+		crypto_aead_chacha20poly1305_ietf_encrypt(
+		        ciphertext, &ciphertext_len, message, MESSAGE_SIZE, NULL, 0,
+		        NULL, nonce, key);
+	}
 
 	free(message);
 	free(ciphertext);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sodium.h>
 #include <stdio.h>
 #include <string.h>
@@ -15,12 +16,16 @@ main(void)
 	unsigned char derived_key[DERIVED_KEY_LEN];
 	randombytes_buf(salt, sizeof(salt));
 
-	if (crypto_pwhash(
-	            derived_key, sizeof(derived_key), password, strlen(password),
-	            salt, crypto_pwhash_OPSLIMIT_INTERACTIVE,
-	            crypto_pwhash_MEMLIMIT_INTERACTIVE, crypto_pwhash_ALG_DEFAULT)
-	    != 0) {
-		return 1;
+	BENCH_LOOP("derive", 1)
+	{
+		if (crypto_pwhash(derived_key, sizeof(derived_key), password,
+		                  strlen(password), salt,
+		                  crypto_pwhash_OPSLIMIT_INTERACTIVE,
+		                  crypto_pwhash_MEMLIMIT_INTERACTIVE,
+		                  crypto_pwhash_ALG_DEFAULT)
+		    != 0) {
+			return 1;
+		}
 	}
 
 	return 0;
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sodium.h>
 #include <stdio.h>
 #include <stdlib.h>
@@ -18,7 +19,10 @@ main(void)
 
 	unsigned char hash[HASH_SIZE];
 
-	crypto_generichash(hash, sizeof(hash), buffer, BUFFER_SIZE, NULL, 0);
+	BENCH_LOOP("hash", BUFFER_SIZE)
+	{
+		crypto_generichash(hash, sizeof(hash), buffer, BUFFER_SIZE, NULL, 0);
+	}
 
 	free(buffer);
 	return 0;
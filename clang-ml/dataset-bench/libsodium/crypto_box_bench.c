@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sodium.h>
 #include <stdio.h>
 #include <stdlib.h>
@@ -26,10 +27,13 @@ main(void)
 
 	unsigned char nonce[crypto_box_NONCEBYTES];
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		randombytes_buf(nonce, sizeof(nonce));
-		crypto_box_easy(ciphertext, message, MESSAGE_SIZE, nonce, bob_pk,
-		                alice_sk);
+	BENCH_LOOP("box", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			randombytes_buf(nonce, sizeof(nonce));
+			crypto_box_easy(ciphertext, message, MESSAGE_SIZE, nonce,
+			                bob_pk, alice_sk);
+		}
 	}
 
 	free(message);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sodium.h>
 #include <stdlib.h>
 
@@ -22,9 +23,12 @@ main(void)
 	unsigned char      signed_message[MESSAGE_SIZE + crypto_sign_BYTES];
 	unsigned long long signed_message_len;
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		crypto_sign(signed_message, &signed_message_len, message,
-		            MESSAGE_SIZE, sk);
+	BENCH_LOOP("sign", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			crypto_sign(signed_message, &signed_message_len, message,
+			            MESSAGE_SIZE, sk);
+		}
 	}
 
 	free(message);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sodium.h>
 #include <stdlib.h>
 
@@ -26,11 +27,14 @@ main(void)
 	unsigned char      unsigned_message[MESSAGE_SIZE];
 	unsigned long long unsigned_message_len;
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		if (crypto_sign_open(unsigned_message, &unsigned_message_len,
-		                     signed_message, signed_message_len, pk)
-		    != 0) {
-			return 1;
+	BENCH_LOOP("verify", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			if (crypto_sign_open(unsigned_message, &unsigned_message_len,
+			                     signed_message, signed_message_len, pk)
+			    != 0) {
+				return 1;
+			}
 		}
 	}
 
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <libxml/parser.h>
 #define LOOP_COUNT 1000
 
@@ -6,9 +7,12 @@ static xmlSAXHandler sax_handler = { 0 };
 int
 main()
 {
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		if (xmlSAXUserParseFile(&sax_handler, NULL, "books.xml") != 0) {
-			return 1;
+	BENCH_LOOP("sax_parse", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			if (xmlSAXUserParseFile(&sax_handler, NULL, "books.xml") != 0) {
+				return 1;
+			}
 		}
 	}
 	xmlCleanupParser();
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <libxml/parser.h>
 #define LOOP_COUNT 1000
 
@@ -10,12 +11,15 @@ main()
 
 	xmlChar *mem;
 	int      size;
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		xmlDocDumpMemory(doc, &mem, &size);
-		if (mem) {
-			xmlFree(mem);
-		} else {
-			return 1;
+	BENCH_LOOP("serialize", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			xmlDocDumpMemory(doc, &mem, &size);
+			if (mem) {
+				xmlFree(mem);
+			} else {
+				return 1;
+			}
 		}
 	}
 
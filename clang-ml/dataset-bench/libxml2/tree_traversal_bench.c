@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <libxml/parser.h>
 #define LOOP_COUNT 1000
 
@@ -19,9 +20,12 @@ main()
 		return 1;
 	xmlNode *root_element = xmlDocGetRootElement(doc);
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		node_count = 0;
-		walk_tree(root_element);
+	BENCH_LOOP("traverse", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			node_count = 0;
+			walk_tree(root_element);
+		}
 	}
 
 	xmlFreeDoc(doc);
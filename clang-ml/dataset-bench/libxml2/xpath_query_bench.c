@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <libxml/parser.h>
 #include <libxml/xpath.h>
 #define LOOP_COUNT 5000
@@ -13,12 +14,15 @@ main()
 		return 1;
 
 	const xmlChar *xpathExpr = (const xmlChar *)"//book[price>10]";
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		xmlXPathObjectPtr xpathObj
-		        = xmlXPathEvalExpression(xpathExpr, xpathCtx);
-		if (xpathObj == NULL)
-			return 1;
-		xmlXPathFreeObject(xpathObj);
+	BENCH_LOOP("xpath", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			xmlXPathObjectPtr xpathObj
+			        = xmlXPathEvalExpression(xpathExpr, xpathCtx);
+			if (xpathObj == NULL)
+				return 1;
+			xmlXPathFreeObject(xpathObj);
+		}
 	}
 
 	xmlXPathFreeContext(xpathCtx);
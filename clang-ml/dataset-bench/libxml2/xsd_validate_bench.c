@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <libxml/parser.h>
 #include <libxml/xmlschemas.h>
 #define LOOP_COUNT 500
@@ -14,10 +15,13 @@ main()
 	xmlSchemaValidCtxtPtr  vctxt  = xmlSchemaNewValidCtxt(schema);
 
 	int                    result = 0;
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		if (xmlSchemaValidateDoc(vctxt, doc) != 0) {
-			result = 1;
-			break;
+	BENCH_LOOP("validate", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			if (xmlSchemaValidateDoc(vctxt, doc) != 0) {
+				result = 1;
+				break;
+			}
 		}
 	}
 
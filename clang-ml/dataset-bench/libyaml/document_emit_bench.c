@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <yaml.h>
 #include <stdio.h>
 
@@ -23,17 +24,20 @@ main()
 	unsigned char  buffer[BUFFER_SIZE];
 	size_t         written = 0;
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		yaml_emitter_initialize(&emitter);
-		yaml_emitter_set_output_string(&emitter, buffer, BUFFER_SIZE,
-		                               &written);
+	BENCH_LOOP("emit", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			yaml_emitter_initialize(&emitter);
+			yaml_emitter_set_output_string(&emitter, buffer, BUFFER_SIZE,
+			                               &written);
 
-		if (yaml_emitter_dump(&emitter, &document) != 1) {
+			if (yaml_emitter_dump(&emitter, &document) != 1) {
+				yaml_emitter_delete(&emitter);
+				yaml_document_delete(&document);
+				return 1;
+			}
 			yaml_emitter_delete(&emitter);
-			yaml_document_delete(&document);
-			return 1;
 		}
-		yaml_emitter_delete(&emitter);
 	}
 
 	yaml_document_delete(&document);
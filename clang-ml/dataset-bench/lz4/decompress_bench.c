@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "lz4.h"
 #include <stdio.h>
 #include <stdlib.h>
@@ -49,11 +50,14 @@ main(int argc, char *argv[])
 	if (!decompressed_buffer)
 		return 1;
 
-	const int decompressed_size
-	        = LZ4_decompress_safe(compressed_buffer, decompressed_buffer,
-	                              compressed_size, original_size);
-	if (decompressed_size < 0)
-		return 1;
+	BENCH_LOOP("decompress", original_size)
+	{
+		const int decompressed_size
+		        = LZ4_decompress_safe(compressed_buffer, decompressed_buffer,
+		                              compressed_size, original_size);
+		if (decompressed_size < 0)
+			return 1;
+	}
 
 	free(original_buffer);
 	free(compressed_buffer);
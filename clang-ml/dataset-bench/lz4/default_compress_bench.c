@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "lz4.h"
 #include <stdio.h>
 #include <stdlib.h>
@@ -40,12 +41,15 @@ main(int argc, char *argv[])
 		return 1;
 	}
 
-	const int compressed_size = LZ4_compress_default(
-	        in_buffer, compressed_buffer, in_size, max_dst_size);
-	if (compressed_size <= 0) {
-		free(in_buffer);
-		free(compressed_buffer);
-		return 1;
+	BENCH_LOOP("compress", in_size)
+	{
+		const int compressed_size = LZ4_compress_default(
+		        in_buffer, compressed_buffer, in_size, max_dst_size);
+		if (compressed_size <= 0) {
+			free(in_buffer);
+			free(compressed_buffer);
+			return 1;
+		}
 	}
 
 	free(in_buffer);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include "lz4hc.h"
 #include <stdio.h>
 #include <stdlib.h>
@@ -40,11 +41,14 @@ main(int argc, char *argv[])
 		return 1;
 	}
 
-	const int compressed_size = LZ4_compress_HC(in_buffer, compressed_buffer,
-	                                            in_size, max_dst_size,
-	                                            LZ4HC_CLEVEL_DEFAULT);
-	if (compressed_size <= 0)
-		return 1;
+	BENCH_LOOP("compress_hc", in_size)
+	{
+		const int compressed_size = LZ4_compress_HC(
+		        in_buffer, compressed_buffer, in_size, max_dst_size,
+		        LZ4HC_CLEVEL_DEFAULT);
+		if (compressed_size <= 0)
+			return 1;
+	}
 
 	free(in_buffer);
 	free(compressed_buffer);
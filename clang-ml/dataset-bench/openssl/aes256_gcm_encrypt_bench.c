@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <openssl/evp.h>
 #include <stdlib.h>
 
@@ -16,11 +17,14 @@ main()
 	EVP_CIPHER_CTX *ctx = EVP_CIPHER_CTX_new();
 	int             len, ciphertext_len;
 
-	EVP_EncryptInit_ex(ctx, EVP_aes_256_gcm(), NULL, key, iv);
-	EVP_EncryptUpdate(ctx, ciphertext, &len, plaintext, BUFFER_SIZE);
-	ciphertext_len = len;
-	EVP_EncryptFinal_ex(ctx, ciphertext + len, &len);
-	ciphertext_len += len;
+	BENCH_LOOP("encrypt", BUFFER_SIZE)
+	{
+		EVP_EncryptInit_ex(ctx, EVP_aes_256_gcm(), NULL, key, iv);
+		EVP_EncryptUpdate(ctx, ciphertext, &len, plaintext, BUFFER_SIZE);
+		ciphertext_len = len;
+		EVP_EncryptFinal_ex(ctx, ciphertext + len, &len);
+		ciphertext_len += len;
+	}
 
 	EVP_CIPHER_CTX_free(ctx);
 	free(plaintext);
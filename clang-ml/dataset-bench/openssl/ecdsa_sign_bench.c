@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <openssl/evp.h>
 #include <openssl/ec.h>
 
@@ -16,12 +17,15 @@ main()
 	unsigned char       sig[256];
 	size_t              siglen;
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		EVP_MD_CTX *mdctx = EVP_MD_CTX_new();
-		EVP_DigestSignInit(mdctx, NULL, EVP_sha256(), NULL, pkey);
-		EVP_DigestSignUpdate(mdctx, msg, sizeof(msg));
-		EVP_DigestSignFinal(mdctx, sig, &siglen);
-		EVP_MD_CTX_free(mdctx);
+	BENCH_LOOP("sign", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			EVP_MD_CTX *mdctx = EVP_MD_CTX_new();
+			EVP_DigestSignInit(mdctx, NULL, EVP_sha256(), NULL, pkey);
+			EVP_DigestSignUpdate(mdctx, msg, sizeof(msg));
+			EVP_DigestSignFinal(mdctx, sig, &siglen);
+			EVP_MD_CTX_free(mdctx);
+		}
 	}
 
 	EVP_PKEY_CTX_free(pctx);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <openssl/evp.h>
 #define ITERATIONS 100000
 
@@ -8,8 +9,11 @@ main()
 	const char          password[] = "my-secret-password";
 	const unsigned char salt[]     = "random-salt";
 
-	PKCS5_PBKDF2_HMAC(password, -1, salt, sizeof(salt), ITERATIONS,
-	                  EVP_sha256(), sizeof(out), out);
+	BENCH_LOOP("derive", ITERATIONS)
+	{
+		PKCS5_PBKDF2_HMAC(password, -1, salt, sizeof(salt), ITERATIONS,
+		                  EVP_sha256(), sizeof(out), out);
+	}
 
 	return 0;
 }
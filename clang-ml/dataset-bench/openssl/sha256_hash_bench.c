@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <openssl/evp.h>
 #include <stdlib.h>
 
@@ -15,9 +16,12 @@ main()
 	unsigned char md_value[EVP_MAX_MD_SIZE];
 	unsigned int  md_len;
 
-	EVP_DigestInit_ex(mdctx, md, NULL);
-	EVP_DigestUpdate(mdctx, buffer, BUFFER_SIZE);
-	EVP_DigestFinal_ex(mdctx, md_value, &md_len);
+	BENCH_LOOP("hash", BUFFER_SIZE)
+	{
+		EVP_DigestInit_ex(mdctx, md, NULL);
+		EVP_DigestUpdate(mdctx, buffer, BUFFER_SIZE);
+		EVP_DigestFinal_ex(mdctx, md_value, &md_len);
+	}
 
 	EVP_MD_CTX_free(mdctx);
 	free(buffer);
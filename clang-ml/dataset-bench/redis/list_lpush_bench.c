@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <hiredis/hiredis.h>
 #define TOTAL_COMMANDS 10000
 
@@ -11,9 +12,12 @@ main()
 	redisCommand(c, "FLUSHDB");
 
 	void *reply;
-	for (int i = 0; i < TOTAL_COMMANDS; i++) {
-		reply = redisCommand(c, "LPUSH mylist value:%d", i);
-		freeReplyObject(reply);
+	BENCH_ONCE("lpush", TOTAL_COMMANDS)
+	{
+		for (int i = 0; i < TOTAL_COMMANDS; i++) {
+			reply = redisCommand(c, "LPUSH mylist value:%d", i);
+			freeReplyObject(reply);
+		}
 	}
 
 	redisFree(c);
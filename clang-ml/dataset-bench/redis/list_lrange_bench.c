@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <hiredis/hiredis.h>
 #define LIST_SIZE  10000
 #define LOOP_COUNT 1000
@@ -19,9 +20,12 @@ main()
 		freeReplyObject(reply);
 	}
 
-	for (int i = 0; i < LOOP_COUNT; i++) {
-		reply = redisCommand(c, "LRANGE mylist 0 99");
-		freeReplyObject(reply);
+	BENCH_LOOP("lrange", LOOP_COUNT)
+	{
+		for (int i = 0; i < LOOP_COUNT; i++) {
+			reply = redisCommand(c, "LRANGE mylist 0 99");
+			freeReplyObject(reply);
+		}
 	}
 
 	redisFree(c);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <hiredis/hiredis.h>
 #define TOTAL_COMMANDS 10000
 
@@ -10,14 +11,17 @@ main()
 
 	redisCommand(c, "FLUSHDB");
 
-	for (int i = 0; i < TOTAL_COMMANDS; i++) {
-		redisAppendCommand(c, "SET key:%d value:%d", i, i);
-	}
+	BENCH_ONCE("pipelined_set", TOTAL_COMMANDS)
+	{
+		for (int i = 0; i < TOTAL_COMMANDS; i++) {
+			redisAppendCommand(c, "SET key:%d value:%d", i, i);
+		}
 
-	void *reply;
-	for (int i = 0; i < TOTAL_COMMANDS; i++) {
-		redisGetReply(c, &reply);
-		freeReplyObject(reply);
+		void *reply;
+		for (int i = 0; i < TOTAL_COMMANDS; i++) {
+			redisGetReply(c, &reply);
+			freeReplyObject(reply);
+		}
 	}
 
 	redisFree(c);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <hiredis/hiredis.h>
 #define TOTAL_OPS 5000
 
@@ -11,11 +12,14 @@ main()
 	redisCommand(c, "FLUSHDB");
 
 	void *reply;
-	for (int i = 0; i < TOTAL_OPS; i++) {
-		reply = redisCommand(c, "SET key:%d value:%d", i, i);
-		freeReplyObject(reply);
-		reply = redisCommand(c, "GET key:%d", i);
-		freeReplyObject(reply);
+	BENCH_ONCE("set_get", TOTAL_OPS)
+	{
+		for (int i = 0; i < TOTAL_OPS; i++) {
+			reply = redisCommand(c, "SET key:%d value:%d", i, i);
+			freeReplyObject(reply);
+			reply = redisCommand(c, "GET key:%d", i);
+			freeReplyObject(reply);
+		}
 	}
 
 	redisFree(c);
@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sqlite3.h>
 #include <stdio.h>
 
@@ -29,11 +30,14 @@ main()
 	sqlite3_stmt *stmt;
 	sqlite3_prepare_v2(db, sql_insert, -1, &stmt, 0);
 
-	for (int i = 0; i < NUM_INSERTS; i++) {
-		sqlite3_bind_int(stmt, 1, i);
-		sqlite3_bind_text(stmt, 2, "test_user_name", -1, SQLITE_STATIC);
-		sqlite3_step(stmt);
-		sqlite3_reset(stmt);
+	BENCH_ONCE("insert", NUM_INSERTS)
+	{
+		for (int i = 0; i < NUM_INSERTS; i++) {
+			sqlite3_bind_int(stmt, 1, i);
+			sqlite3_bind_text(stmt, 2, "test_user_name", -1, SQLITE_STATIC);
+			sqlite3_step(stmt);
+			sqlite3_reset(stmt);
+		}
 	}
 
 	sqlite3_finalize(stmt);
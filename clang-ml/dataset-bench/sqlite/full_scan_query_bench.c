@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sqlite3.h>
 #include <stdio.h>
 #include <stdlib.h>
@@ -29,13 +30,16 @@ main()
 	sqlite3_exec(db, "COMMIT;", 0, 0, 0);
 
 	sqlite3_prepare_v2(db, "SELECT * FROM Users WHERE Name = ?;", -1, &stmt, 0);
-	for (int i = 0; i < NUM_QUERIES; i++) {
-		char name_to_find[20];
-		sprintf(name_to_find, "user%d", rand() % TABLE_SIZE);
-		sqlite3_bind_text(stmt, 1, name_to_find, -1, SQLITE_TRANSIENT);
-		while (sqlite3_step(stmt) == SQLITE_ROW) {
+	BENCH_LOOP("query", NUM_QUERIES)
+	{
+		for (int i = 0; i < NUM_QUERIES; i++) {
+			char name_to_find[20];
+			sprintf(name_to_find, "user%d", rand() % TABLE_SIZE);
+			sqlite3_bind_text(stmt, 1, name_to_find, -1, SQLITE_TRANSIENT);
+			while (sqlite3_step(stmt) == SQLITE_ROW) {
+			}
+			sqlite3_reset(stmt);
 		}
-		sqlite3_reset(stmt);
 	}
 	sqlite3_finalize(stmt);
 
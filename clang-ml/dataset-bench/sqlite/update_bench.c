@@ -1,3 +1,4 @@
+#include <bench.h>
 #include <sqlite3.h>
 #include <stdio.h>
 
@@ -29,10 +30,13 @@ main()
 	sqlite3_prepare_v2(
 	        db, "UPDATE Accounts SET Balance = Balance + 50 WHERE Id = ?;", -1,
 	        &stmt, 0);
-	for (int i = 0; i < NUM_UPDATES; i++) {
-		sqlite3_bind_int(stmt, 1, i);
-		sqlite3_step(stmt);
-		sqlite3_reset(stmt);
+	BENCH_ONCE("update", NUM_UPDATES)
+	{
+		for (int i = 0; i < NUM_UPDATES; i++) {
+			sqlite3_bind_int(stmt, 1, i);
+			sqlite3_step(stmt);
+			sqlite3_reset(stmt);
+		}
 	}
 	sqlite3_finalize(stmt);
 	sqlite3_exec(db, "COMMIT;", 0, 0, 0);
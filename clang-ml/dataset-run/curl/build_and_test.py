@@ -1,187 +1,52 @@
 #!/usr/bin/env python3
 
-import argparse
-import json
-import os
 import shutil
-import subprocess
-import time
-import datetime
-import statistics
-import multiprocessing as mp
+import sys
 from pathlib import Path
-from typing import List, Dict, Any
 
-PROJECT_NAME = "curl"
-
-
-def run_command(
-    cmd: List[str], cwd: Path = None, env: Dict[str, str] = None
-) -> subprocess.CompletedProcess:
-    print(f"[CMD] {' '.join(cmd[:4])} ...")
-    return subprocess.run(
-        cmd, cwd=cwd, env=env, check=True, text=True, capture_output=True
-    )
-
-
-def setup_paths(script_path: Path) -> Dict[str, Path]:
-    root_dir = script_path.parents[2]
-    build_dir = root_dir / "dataset" / f"{PROJECT_NAME}-build"
-    return {
-        "root": root_dir,
-        "project_src": root_dir / "dataset" / PROJECT_NAME,
-        "bench_src": root_dir / "dataset-bench" / PROJECT_NAME,
-        "results_dir": root_dir / "results" / PROJECT_NAME,
-        "build_dir": build_dir,
-    }
-
-
-def parse_arguments() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description=f"Build and benchmark {PROJECT_NAME}.")
-    parser.add_argument(
-        "--clang", default="clang", help="Path to the clang executable."
-    )
-    parser.add_argument(
-        "--runs", type=int, default=3, help="Number of repetitions for each benchmark."
-    )
-    parser.add_argument(
-        "flags", nargs=argparse.REMAINDER, help="Clang compiler flags (prefix with --)."
-    )
-    args = parser.parse_args()
-    args.flags = [flag for flag in args.flags if flag != "--"]
-    return args
-
-
-def build_project(
-    paths: Dict[str, Path], clang_path: str, clang_flags: List[str]
-) -> List[Path]:
-    """Сборка curl с помощью Autotools."""
-    project_src = paths["project_src"]
-    build_dir = paths["build_dir"]
-
-    if build_dir.exists():
-        shutil.rmtree(build_dir)
-    shutil.copytree(project_src, build_dir)
-
-    print("[*] Running buildconf...")
-    run_command(["./buildconf"], cwd=build_dir)
-
-    env = os.environ.copy()
-    env["CC"] = clang_path
-    env["CFLAGS"] = " ".join(clang_flags)
-
-    print(f"[*] Configuring with CFLAGS: {env['CFLAGS']}")
-    run_command(["./configure", "--quiet", "--without-ssl"], cwd=build_dir, env=env)
-
-    print("[*] Building curl...")
-    run_command(["make", "-j", str(mp.cpu_count())], cwd=build_dir, env=env)
-
-    curl_bin = build_dir / "src" / "curl"
-    if not curl_bin.exists():
-        raise RuntimeError("curl binary not found after build.")
-
-    return [curl_bin]
-
-
-def run_benchmarks(
-    executables: List[Path], runs: int, paths: Dict[str, Path]
-) -> List[Dict[str, Any]]:
-    """Запускает python-скрипты для тестирования curl."""
-    if not executables:
-        return []
-
-    curl_bin = executables[0]
-    binary_size = curl_bin.stat().st_size
-    results = []
-    bench_src = paths["bench_src"]
-    build_dir = paths["build_dir"]
-
-    bench_scripts = sorted(bench_src.glob("*_bench.py"))
-    print(f"[*] Running {len(bench_scripts)} benchmarks for curl...")
-
-    for bench_script in bench_scripts:
-        bench_name = bench_script.stem
-
-        run_dir = build_dir / f"run_{bench_name}"
-        run_dir.mkdir(exist_ok=True)
-        shutil.copy(curl_bin, run_dir / "curl")
-        shutil.copy(bench_script, run_dir / "run_bench.py")
-        if (bench_src / "test.txt").exists():
-            shutil.copy(bench_src / "test.txt", run_dir)
-
-        timings = []
-        try:
-            for i in range(runs):
-                print(f"  - Running {bench_name} (run {i + 1}/{runs})...")
-                start_time = time.perf_counter()
-                run_command(["python3", "run_bench.py"], cwd=run_dir)
-                end_time = time.perf_counter()
-                timings.append(end_time - start_time)
-
-            avg_time = statistics.mean(timings)
-
-            results.append(
-                {
-                    "bench": bench_name,
-                    "bytes": binary_size,
-                    "seconds": avg_time,
-                }
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+import workspace  # noqa: E402
+from harness import Bench, Project, main, run_command  # noqa: E402
+
+
+class Curl(Project):
+    name = "curl"
+
+    def configure(self):
+        shutil.copytree(self.src, self.build_dir, dirs_exist_ok=True)
+        run_command(["./buildconf"], cwd=self.build_dir)
+        # static libcurl: otherwise src/curl is a libtool wrapper script and
+        # neither sample reuse nor the build cache would see the real code
+        run_command(
+            ["./configure", "--quiet", "--without-ssl", "--disable-shared"],
+            cwd=self.build_dir,
+            env=self.env,
+        )
+
+    def build(self):
+        run_command(["make", "-j", workspace.jobs()], cwd=self.build_dir, env=self.env)
+        curl_bin = self.build_dir / "src" / "curl"
+        if not curl_bin.exists():
+            raise RuntimeError("curl binary not found after build.")
+        return [curl_bin]
+
+    def benches(self, executables):
+        curl_bin = executables[0]
+        for spec in sorted(self.bench_src.glob("*_bench.spec")):
+            run_dir = self.build_dir / f"run_{spec.stem}"
+            run_dir.mkdir(exist_ok=True)
+            shutil.copy(curl_bin, run_dir / "curl")
+            if (self.bench_src / "test.txt").exists():
+                shutil.copy(self.bench_src / "test.txt", run_dir)
+            yield Bench(
+                spec.stem,
+                self.spawn_command(spec, cwd=str(run_dir)),
+                curl_bin,
+                files=sorted(run_dir.iterdir()),
+                cwd=run_dir,
+                scratch=run_dir,
             )
-            print(f"    {bench_name:<25} {binary_size:8d} bytes, {avg_time:.6f}s avg")
-
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"[ERROR] Failed to run benchmark {bench_name}: {e}")
-            if hasattr(e, "stderr"):
-                print(e.stderr)
-
-        finally:
-            shutil.rmtree(run_dir)
-
-    return results
-
-
-def save_results(results: List[Dict[str, Any]], paths: Dict[str, Path]):
-    if not results:
-        print("[WARN] No results to save.")
-        return
-    results_dir = paths["results_dir"]
-    results_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = results_dir / f"results_{timestamp}.json"
-    with open(output_file, "w") as f:
-        json.dump(results, f, indent=2)
-    print(f"\n[SUCCESS] Results saved to {output_file.relative_to(paths['root'])}")
-
-
-def main():
-    args = parse_arguments()
-    paths = setup_paths(Path(__file__).resolve())
-    print(f"[*] Project:      {PROJECT_NAME}")
-    print(f"[*] Build dir:    {paths['build_dir']}")
-    print(f"[*] Clang flags:  {' '.join(args.flags) or '(none)'}")
-
-    try:
-        print("\n[*] Starting build...")
-        executables = build_project(paths, args.clang, args.flags)
-
-        print("\n[*] Starting benchmarks...")
-        results = run_benchmarks(executables, args.runs, paths)
-
-        save_results(results, paths)
-
-        print(f"[*] Cleaning up build directory: {paths['build_dir']}")
-        shutil.rmtree(paths["build_dir"])
-
-    except (subprocess.CalledProcessError, RuntimeError) as e:
-        print(f"\n[FATAL ERROR] An error occurred during the process.")
-        if hasattr(e, "stderr") and e.stderr:
-            print("------- STDERR -------\n" + e.stderr + "\n----------------------")
-        else:
-            print(e)
-        if paths["build_dir"].exists():
-            shutil.rmtree(paths["build_dir"])
-        exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    main(Curl)
@@ -0,0 +1,208 @@
+"""
+Append-only storage for the flag dataset collected by get-data.py.
+
+Records ({"flags": str, "results": {project: [{"bench", "bytes", "seconds",
+...}, ...]}}) are appended to a JSON Lines file, one line per configuration,
+and fsync'ed before the next configuration starts, so a crash loses at most the
+record being written and never the ones before it. A truncated last line is
+ignored on read.
+
+export_columnar() flattens any dataset (legacy .json list, .jsonl, .npz,
+.parquet) into a long table: one row per (config, bench), with the flag
+strings per config. "seconds" is the median of the kept samples where the
+adaptive sampler ran; its relative CI half-width and p10/p90 become the
+"ci", "p10" and "p90" columns (NaN for older records, which only have a
+mean). "timing" says how a run was timed: "process" (whole process, the
+default for older records), "region" (bench.h regions) or "spawn" (the
+tool's invocations through the spawn driver). analyze_flags.py and reduce-data.py read it through load_tables().
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+# measurement spread per bench, from the adaptive sampler (harness.stats)
+SPREAD = ("ci", "p10", "p90")
+
+
+class DatasetStore:
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if not self.path.exists():
+            return
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # only the last line can be torn by a crash mid-append
+                    return
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def measured_flags(self) -> Set[str]:
+        return {record["flags"] for record in self}
+
+    def append(self, record: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._drop_torn_tail()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with open(self.path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _drop_torn_tail(self):
+        # a record cut short by a crash would otherwise glue onto the next one
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with open(self.path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+
+def read_records(path: PathLike) -> List[Dict]:
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        return list(DatasetStore(path))
+    if path.suffix == ".json":
+        with open(path) as f:
+            return json.load(f)
+    raise ValueError(f"{path}: not a record file (.json or .jsonl)")
+
+
+def flatten(records: List[Dict]) -> Dict[str, np.ndarray]:
+    flags = [r["flags"] for r in records]
+    config, project, bench, seconds, size = [], [], [], [], []
+    spread = {k: [] for k in SPREAD}
+    timing = []
+    for ci, record in enumerate(records):
+        for proj, benches in record["results"].items():
+            for b in benches:
+                config.append(ci)
+                project.append(proj)
+                bench.append(f"{proj}/{b['bench']}")
+                seconds.append(b["seconds"])
+                size.append(b["bytes"])
+                for k, v in spread.items():
+                    # None: CI undefined (a single sample)
+                    v.append(np.inf if k in b and b[k] is None else b.get(k, np.nan))
+                timing.append(b.get("timing", "process"))
+    projects, project_codes = np.unique(
+        np.array(project, dtype=str), return_inverse=True
+    )
+    benches, bench_codes = np.unique(np.array(bench, dtype=str), return_inverse=True)
+    return {
+        "flags": np.array(flags, dtype=str),
+        "config": np.array(config, dtype=np.int32),
+        "projects": projects,
+        "project": project_codes.astype(np.int32),
+        "benches": benches,
+        "bench": bench_codes.astype(np.int32),
+        "seconds": np.array(seconds, dtype=np.float64),
+        "bytes": np.array(size, dtype=np.int64),
+        **{k: np.array(v, dtype=np.float64) for k, v in spread.items()},
+        "timing": np.array(timing, dtype=str),
+    }
+
+
+def export_columnar(src: PathLike, out: PathLike) -> Path:
+    # .npz (numpy only) or .parquet (needs pandas + pyarrow)
+    out = Path(out)
+    cols = flatten(read_records(src))
+    if out.suffix == ".parquet":
+        long, flags = _frames(cols)
+        long.to_parquet(out, index=False)
+        flags.to_parquet(out.with_suffix(".flags.parquet"), index=False)
+    else:
+        np.savez(out, **cols)
+    return out
+
+
+def _frames(cols: Dict[str, np.ndarray]):
+    import pandas as pd
+
+    long = pd.DataFrame(
+        {
+            "config": cols["config"],
+            "project": cols["projects"][cols["project"]],
+            "bench": cols["benches"][cols["bench"]],
+            "seconds": cols["seconds"],
+            "bytes": cols["bytes"],
+            # absent in .npz exports from before the adaptive sampler
+            **{k: cols.get(k, np.full(len(cols["config"]), np.nan)) for k in SPREAD},
+            "timing": cols.get("timing", np.full(len(cols["config"]), "process")),
+        }
+    )
+    flags = pd.DataFrame(
+        {"config": np.arange(len(cols["flags"])), "flags": cols["flags"]}
+    )
+    return long, flags
+
+
+def load_tables(paths: List[PathLike]) -> Tuple[List[str], "object"]:
+    """(flags per config, long DataFrame) from any mix of dataset files.
+
+    Config ids are renumbered across files in the order given.
+    """
+    import pandas as pd
+
+    all_flags: List[str] = []
+    longs = []
+    for path in map(Path, paths):
+        if path.suffix == ".npz":
+            with np.load(path) as z:
+                long, flags = _frames({k: z[k] for k in z.files})
+        elif path.suffix == ".parquet":
+            long = pd.read_parquet(path)
+            long = long.assign(**{k: np.nan for k in SPREAD if k not in long})
+            if "timing" not in long:
+                long["timing"] = "process"
+            flags = pd.read_parquet(path.with_suffix(".flags.parquet"))
+        else:
+            long, flags = _frames(flatten(read_records(path)))
+        long = long.assign(config=long["config"] + len(all_flags))
+        all_flags += flags.sort_values("config")["flags"].tolist()
+        longs.append(long)
+    if not longs:
+        return [], pd.DataFrame(
+            columns=[
+                "config",
+                "project",
+                "bench",
+                "seconds",
+                "bytes",
+                *SPREAD,
+                "timing",
+            ]
+        )
+    return all_flags, pd.concat(longs, ignore_index=True)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Export a flag dataset to a columnar file."
+    )
+    parser.add_argument("src", help=".json or .jsonl dataset")
+    parser.add_argument("out", help=".npz or .parquet")
+    args = parser.parse_args()
+    print(f"Wrote {export_columnar(args.src, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
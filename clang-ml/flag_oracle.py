@@ -0,0 +1,121 @@
+"""
+Flag-validity oracle for the random flag sampler in get-data.py.
+
+Instead of compiling a probe for every drawn flag set, each flag is probed
+once on its own and once with every flag of the other categories (only one
+flag per category is ever drawn, so same-category pairs never occur). The
+verdicts are cached on disk per `clang --version`, so a compiler upgrade
+re-probes and everything else is a lookup:
+
+  - a flag that compiles alone is usable unless it fails next to a flag
+    that also compiles alone (a conflicting pair);
+  - a flag that fails alone (e.g. -fwhole-program-vtables without -flto) is
+    usable only next to a flag it compiles with (an enabler).
+
+Probes read the source from stdin and write the object to /dev/null, so
+concurrent samplers share no files.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+PROBE_SOURCE = b"int main() { return 0; }\n"
+
+
+def clang_version(clang: str = "clang") -> str:
+    return subprocess.run(
+        [clang, "--version"], stdout=subprocess.PIPE, check=True, text=True
+    ).stdout
+
+
+def probe(flags: Iterable[str], clang: str = "clang") -> bool:
+    result = subprocess.run(
+        [clang, "-x", "c", "-c", "-", "-o", os.devnull, *flags],
+        input=PROBE_SOURCE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+class FlagOracle:
+    def __init__(
+        self,
+        variants: Dict[str, List[str]],
+        cache_dir: str,
+        clang: str = "clang",
+        workers: Optional[int] = None,
+    ):
+        self.variants = variants
+        self.clang = clang
+        version = clang_version(clang)
+        key = hashlib.sha256(version.encode()).hexdigest()[:16]
+        self.cache_file = Path(cache_dir) / f"flag-oracle-{key}.json"
+        cache = self._load(version)
+        category = {f: c for c, fs in variants.items() for f in fs}
+        flags = sorted(category)
+        pairs = [
+            (a, b)
+            for a, b in itertools.combinations(flags, 2)
+            if category[a] != category[b]
+        ]
+        todo = [(f,) for f in flags if f not in cache["flags"]]
+        todo += [p for p in pairs if " ".join(p) not in cache["pairs"]]
+        if todo:
+            print(f"[*] Probing {len(todo)} flag combinations with {self.clang}")
+            with ThreadPoolExecutor(workers or os.cpu_count() or 1) as pool:
+                verdicts = pool.map(lambda p: probe(p, self.clang), todo)
+                for combo, ok in zip(todo, verdicts):
+                    table = cache["flags"] if len(combo) == 1 else cache["pairs"]
+                    table[" ".join(combo)] = ok
+            self._save(cache)
+
+        self.valid: Set[str] = {f for f in flags if cache["flags"][f]}
+        self.conflicts: Set[FrozenSet[str]] = set()
+        self.enablers: Dict[str, Set[str]] = {}
+        for a, b in pairs:
+            ok = cache["pairs"][f"{a} {b}"]
+            if a in self.valid and b in self.valid:
+                if not ok:
+                    self.conflicts.add(frozenset((a, b)))
+            elif ok:
+                for needy, other in ((a, b), (b, a)):
+                    if needy not in self.valid:
+                        self.enablers.setdefault(needy, set()).add(other)
+
+    def _load(self, version: str) -> Dict:
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+            if cache.get("version") == version:
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {"version": version, "flags": {}, "pairs": {}}
+
+    def _save(self, cache: Dict):
+        # write-then-rename, so a concurrent reader sees the old or the new
+        # file and never a partial one
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.cache_file)
+
+    def usable(self, flag: str) -> bool:
+        return flag in self.valid or flag in self.enablers
+
+    def accepts(self, chosen: List[str]) -> bool:
+        present = set(chosen)
+        for flag in chosen:
+            if flag not in self.valid and not self.enablers.get(flag, set()) & present:
+                return False
+        return not any(
+            frozenset(p) in self.conflicts for p in itertools.combinations(chosen, 2)
+        )
@@ -1,10 +1,21 @@
+import argparse
 import os
 import subprocess
+import sys
 import json
 import random
 import shutil
+import signal
 import glob
-from typing import List, Dict, Optional
+import queue
+import threading
+import time
+from typing import List, Dict, Optional, Set
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+import workspace  # noqa: E402
+from dataset_store import DatasetStore, export_columnar  # noqa: E402
+from flag_oracle import FlagOracle, probe  # noqa: E402
 
 FLAG_VARIANTS: Dict[str, List[str]] = {
     "O": [
@@ -90,46 +101,47 @@ FLAG_VARIANTS: Dict[str, List[str]] = {
 }
 
 
-def random_flags(max_flags: Optional[int] = 10, seed: Optional[int] = None) -> str:
+def random_flags(
+    max_flags: Optional[int] = 10,
+    seed: Optional[int] = None,
+    oracle: Optional[FlagOracle] = None,
+) -> str:
+    # With an oracle, draws are checked against cached per-flag and per-pair
+    # verdicts and no compiler runs; without one each draw is probed.
     if seed is not None:
         random.seed(seed)
 
+    variants = FLAG_VARIANTS
+    if oracle is not None:
+        variants = {
+            key: [flag for flag in flags if oracle.usable(flag)]
+            for key, flags in FLAG_VARIANTS.items()
+        }
+
     while True:
         chosen: List[str] = []
-        keys = list(FLAG_VARIANTS)
+        keys = [key for key in variants if variants[key]]
         random.shuffle(keys)
         for key in keys:
             if random.random() < 0.40:
-                chosen.append(random.choice(FLAG_VARIANTS[key]))
+                chosen.append(random.choice(variants[key]))
                 if max_flags and len(chosen) >= max_flags:
                     break
         if not any(flag.startswith("-O") for flag in chosen):
-            chosen.insert(0, random.choice(FLAG_VARIANTS["O"]))
-
-        flags_str = " ".join(chosen)
-
-        test_file = os.path.join(ROOT_DIR, "flag_test.c")
-        with open(test_file, "w") as f:
-            f.write("int main() { return 0; }\n")
+            chosen.insert(0, random.choice(variants["O"]))
 
-        try:
-            subprocess.run(
-                ["clang", "-c", test_file] + flags_str.split(),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True,
-            )
-            os.remove(test_file)
-            return flags_str
-        except subprocess.CalledProcessError:
-            os.remove(test_file)
-            continue
+        if oracle.accepts(chosen) if oracle is not None else probe(chosen):
+            return " ".join(chosen)
 
 
 ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
 DATASET_RUN_DIR = os.path.join(ROOT_DIR, "dataset-run")
 RESULTS_DIR = os.path.join(ROOT_DIR, "results")
-OUTPUT_DATASET_FILE = os.path.join(ROOT_DIR, "ml_dataset.json")
+OUTPUT_DATASET_FILE = os.path.join(ROOT_DIR, "ml_dataset.jsonl")
+WORK_DIR = os.path.join(ROOT_DIR, "work")
+POLL_SECONDS = 0.5
+# how long an aborted batch gets to exit on SIGTERM before SIGKILL
+KILL_GRACE_SECONDS = 10
 NUM_ITERATIONS = 155
 
 
@@ -146,28 +158,207 @@ def get_projects() -> List[str]:
     return projects
 
 
-def clear_results():
-    if os.path.exists(RESULTS_DIR):
-        shutil.rmtree(RESULTS_DIR)
-    os.makedirs(RESULTS_DIR)
+def project_env(opts: argparse.Namespace) -> Dict[str, str]:
+    # Builds are pinned to the build CPUs; measurements take a slot of bench
+    # CPUs. Work and results dirs are per batch, see Batch.env().
+    env = os.environ.copy()
+    env["CLANG_ML_LOCK_DIR"] = os.path.join(opts.work_dir, "locks")
+    if opts.cache_gb > 0:
+        # shared by all slots, unlike the per-batch work dirs
+        env["CLANG_ML_CACHE_DIR"] = os.path.join(opts.work_dir, "cache")
+        env["CLANG_ML_CACHE_BYTES"] = str(int(opts.cache_gb * (1 << 30)))
+    if not opts.no_sample_reuse:
+        env["CLANG_ML_SAMPLES_DIR"] = os.path.join(opts.work_dir, "samples")
+    if opts.build_cpus:
+        env["CLANG_ML_BUILD_CPUS"] = workspace.format_cpus(opts.build_cpus)
+    if opts.bench_slots:
+        env["CLANG_ML_BENCH_SLOTS"] = ";".join(
+            workspace.format_cpus(s) for s in opts.bench_slots
+        )
+    n_build = len(opts.build_cpus) if opts.build_cpus else os.cpu_count() or 1
+    env["CLANG_ML_JOBS"] = str(max(1, n_build // opts.workers))
+    return env
+
+
+class Batch:
+    """One flag configuration moving through the build and measure stages.
+
+    Every project runs as one build_and_test.py process. After building it
+    touches its marker and parks in workspace.bench_slot() until the gate
+    file appears, so a built-but-unmeasured batch is just a set of waiting
+    processes holding their artifacts in a private work dir.
+    """
+
+    def __init__(self, index: int, flags_str: str, opts: argparse.Namespace):
+        self.index = index
+        self.flags_str = flags_str
+        self.opts = opts
+        # at most queue_depth + 1 batches are alive and they retire in
+        # order, so no two live batches share a slot directory
+        slot_dir = os.path.join(opts.work_dir, f"slot{index % (opts.queue_depth + 1)}")
+        self.state_dir = os.path.join(slot_dir, "state")
+        self.results_dir = os.path.join(slot_dir, "results")
+        self.log_dir = os.path.join(slot_dir, "logs")
+        self.slot_dir = slot_dir
+        self.gate = os.path.join(self.state_dir, "gate")
+        self.procs: Dict[str, subprocess.Popen] = {}
+        self.failed: List[str] = []
+        self.built = threading.Event()
+        for d in (self.state_dir, self.results_dir, self.log_dir):
+            shutil.rmtree(d, ignore_errors=True)
+            os.makedirs(d)
+
+    def marker(self, project: str) -> str:
+        return os.path.join(self.state_dir, f"{project}.built")
+
+    def env(self, project: str) -> Dict[str, str]:
+        env = project_env(self.opts)
+        env["CLANG_ML_WORK_DIR"] = os.path.join(self.slot_dir, project)
+        env["CLANG_ML_RESULTS_DIR"] = self.results_dir
+        env["CLANG_ML_BUILT_MARKER"] = self.marker(project)
+        env["CLANG_ML_BENCH_GATE"] = self.gate
+        return env
+
+    def launch(self, project: str):
+        cmd = [sys.executable, "build_and_test.py", "--runs", str(self.opts.runs)]
+        cmd += ["--max-runs", str(self.opts.max_runs)]
+        cmd += ["--target-ci", str(self.opts.target_ci)]
+        cmd += ["--budget", str(self.opts.budget)]
+        cmd += ["--"] + self.flags_str.split()
+        with open(os.path.join(self.log_dir, f"{project}.log"), "w") as log:
+            self.procs[project] = subprocess.Popen(
+                cmd,
+                cwd=os.path.join(DATASET_RUN_DIR, project),
+                env=self.env(project),
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                # its own process group, so abort() reaches the servers and
+                # benches it starts, not just the script
+                start_new_session=True,
+            )
+
+    def open_gate(self, state: str = "go"):
+        # written atomically: a waiting script must never read a partial file
+        tmp = self.gate + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(state)
+        os.replace(tmp, self.gate)
+
+    def wait(self) -> bool:
+        for project, proc in self.procs.items():
+            if proc.wait() != 0 and project not in self.failed:
+                self.failed.append(project)
+        return not self.failed
 
+    def abort(self, kill: bool = False):
+        self.open_gate("abort")
+        if kill:
+            # processes already past the gate are measuring and never read
+            # it again; their partial results are dropped below. SIGTERM
+            # skips the script's finally, so the whole group is signalled:
+            # redis-server on its fixed port must not outlive the batch.
+            self._signal_groups(signal.SIGTERM)
+            for proc in self.procs.values():
+                try:
+                    proc.wait(timeout=KILL_GRACE_SECONDS)
+                except subprocess.TimeoutExpired:
+                    self._signal_groups(signal.SIGKILL)
+        self.wait()
+        if kill:
+            shutil.rmtree(self.results_dir, ignore_errors=True)
 
-def run_project(project: str, flags_str: str) -> bool:
-    project_dir = os.path.join(DATASET_RUN_DIR, project)
-    cmd = ["python", "build_and_test.py", "--runs", "5", "--"] + flags_str.split()
+    def _signal_groups(self, sig: int):
+        # also after the script exited: a child it left behind keeps the
+        # group alive
+        for proc in self.procs.values():
+            try:
+                os.killpg(proc.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def report_failures(self):
+        for project in self.failed:
+            log = os.path.join(self.log_dir, f"{project}.log")
+            print(f"[!] Project {project} failed with flags: {self.flags_str}")
+            print(f"    Log: {log}")
+
+
+def build_stage(batch: Batch, projects: List[str], stop: threading.Event):
+    # up to opts.workers projects compile at once; a project leaves the
+    # build stage when its marker appears (or its process exits). Once stop
+    # is set the batch will never be measured: nothing new is launched and
+    # the builds still running are left to the caller's abort().
+    pending = list(projects)
+    building: List[str] = []
+    while (pending or building) and not stop.is_set():
+        while pending and len(building) < batch.opts.workers:
+            project = pending.pop(0)
+            batch.launch(project)
+            building.append(project)
+        for project in list(building):
+            proc = batch.procs[project]
+            if os.path.exists(batch.marker(project)):
+                building.remove(project)
+            elif proc.poll() is not None:
+                building.remove(project)
+                if proc.returncode != 0:
+                    batch.failed.append(project)
+        if batch.failed:
+            # the configuration is discarded anyway, stop launching projects
+            break
+        time.sleep(POLL_SECONDS)
+    batch.built.set()
+
+
+def producer(
+    projects: List[str],
+    opts: argparse.Namespace,
+    batches: "queue.Queue[Optional[Batch]]",
+    in_flight: threading.Semaphore,
+    stop: threading.Event,
+    seen: Set[str],
+    oracle: FlagOracle,
+    errors: List[BaseException],
+):
+    # Build stage: compiles configuration i+1 while the main thread measures
+    # configuration i. in_flight bounds built-but-unmeasured batches; seen
+    # holds flag sets already stored or in flight, which are never redrawn.
+    # An exception lands in errors for main() to re-raise; the batch being
+    # built and the None sentinel are released either way, so main() never
+    # blocks on a dead thread.
+    index = 0
+    batch = None
     try:
-        subprocess.run(cmd, cwd=project_dir, check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"[!] Project {project} failed with flags: {flags_str}")
-        print(f"    Error: {e}")
-        return False
+        while not stop.is_set():
+            if not in_flight.acquire(timeout=POLL_SECONDS):
+                continue
+            if stop.is_set():
+                in_flight.release()
+                break
+            flags_str = random_flags(oracle=oracle)
+            while flags_str in seen:
+                flags_str = random_flags(oracle=oracle)
+            seen.add(flags_str)
+            batch = Batch(index, flags_str, opts)
+            index += 1
+            print(f"[build]   config {batch.index}: {batch.flags_str}")
+            batches.put(batch)
+            build_stage(batch, projects, stop)
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        # errors is filled first: main() checks it before measuring
+        if batch is not None:
+            batch.built.set()
+        batches.put(None)
 
 
-def collect_results(projects: List[str]) -> Dict[str, List[Dict]]:
+def collect_results(
+    projects: List[str], results_dir: str = RESULTS_DIR
+) -> Dict[str, List[Dict]]:
     all_results = {}
     for project in projects:
-        project_results_dir = os.path.join(RESULTS_DIR, project)
+        project_results_dir = os.path.join(results_dir, project)
         if not os.path.exists(project_results_dir):
             raise ValueError(f"No results dir for {project}")
         json_files = glob.glob(os.path.join(project_results_dir, "*.json"))
@@ -181,36 +372,201 @@ def collect_results(projects: List[str]) -> Dict[str, List[Dict]]:
     return all_results
 
 
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Collect benchmark results for random clang flag sets."
+    )
+    parser.add_argument("--iterations", type=int, default=NUM_ITERATIONS)
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Minimum timed runs per bench."
+    )
+    parser.add_argument(
+        "--max-runs", type=int, default=50, help="Maximum timed runs per bench."
+    )
+    parser.add_argument(
+        "--target-ci",
+        type=float,
+        default=0.01,
+        help="Relative 95%% CI half-width of the median at which a bench stops.",
+    )
+    parser.add_argument(
+        "--budget", type=float, default=60.0, help="Timed seconds per bench at most."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Projects built concurrently."
+    )
+    parser.add_argument(
+        "--build-cpus", help="CPU list for builds, e.g. 0-11 (default: all)."
+    )
+    parser.add_argument(
+        "--bench-cpus",
+        help="CPU list reserved for measurements, e.g. 12-15 (default: none).",
+    )
+    parser.add_argument(
+        "--bench-slot-size",
+        type=int,
+        default=1,
+        help="CPUs per measurement slot; benches run one per slot.",
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=1,
+        help="Configurations built ahead of the one being measured.",
+    )
+    parser.add_argument("--work-dir", default=WORK_DIR)
+    parser.add_argument(
+        "--cache-gb",
+        type=float,
+        default=20.0,
+        help="Size of the shared build cache in the work dir, 0 disables it.",
+    )
+    parser.add_argument(
+        "--no-sample-reuse",
+        action="store_true",
+        help="Measure every configuration even when its binary matches an earlier one.",
+    )
+    parser.add_argument(
+        "--output", default=OUTPUT_DATASET_FILE, help="Append-only JSONL dataset."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an existing dataset; stored flag sets count and are skipped.",
+    )
+    parser.add_argument(
+        "--export", help="Also write a columnar copy (.npz or .parquet) at the end."
+    )
+    opts = parser.parse_args()
+
+    all_cpus = (
+        os.sched_getaffinity(0)
+        if hasattr(os, "sched_getaffinity")
+        else set(range(os.cpu_count() or 1))
+    )
+    bench = workspace.parse_cpus(opts.bench_cpus) if opts.bench_cpus else set()
+    if opts.build_cpus:
+        opts.build_cpus = workspace.parse_cpus(opts.build_cpus)
+    else:
+        opts.build_cpus = (all_cpus - bench) or all_cpus
+    if bench & opts.build_cpus:
+        parser.error("--build-cpus and --bench-cpus overlap")
+    if not bench:
+        # no reserved cores: measurements still run one at a time, but they
+        # share the machine with builds
+        opts.bench_slots = [all_cpus]
+        return opts
+    bench = sorted(bench)
+    size = opts.bench_slot_size
+    if size < 1 or size > len(bench):
+        # zero slots would leave CLANG_ML_BENCH_SLOTS unset: benches would
+        # run unpinned next to the builds without any error
+        parser.error(
+            f"--bench-slot-size {size} does not fit in {len(bench)} --bench-cpus"
+        )
+    opts.bench_slots = [
+        set(bench[i : i + size]) for i in range(0, len(bench) - size + 1, size)
+    ]
+    unused = bench[len(opts.bench_slots) * size :]
+    if unused:
+        print(
+            f"[!] Bench CPUs {workspace.format_cpus(unused)} do not fill a "
+            f"slot of {size} and stay idle"
+        )
+    return opts
+
+
 def main():
+    opts = parse_arguments()
     projects = get_projects()
-    dataset = []
-
-    i = 0
-    while i < NUM_ITERATIONS:
-        print(f"Iteration {i + 1}/{NUM_ITERATIONS}")
-        clear_results()
-        flags_str = random_flags()
-        print(f"Generated flags: {flags_str}")
-
-        success = True
-        for project in projects:
-            if not run_project(project, flags_str):
-                success = False
-                break
+    store = DatasetStore(opts.output)
+    seen = store.measured_flags()
+    if seen and not opts.resume:
+        raise SystemExit(
+            f"{opts.output} already holds {len(seen)} configurations; "
+            "pass --resume to continue it or --output for a new file"
+        )
+    done = len(seen)
+    if done:
+        print(f"Resuming: {done}/{opts.iterations} configurations already stored")
 
-        if not success:
-            print("[!] Skipping this flag set, will try another one...")
-            continue
+    oracle = FlagOracle(FLAG_VARIANTS, cache_dir=opts.work_dir)
+    unusable = [f for fs in FLAG_VARIANTS.values() for f in fs if not oracle.usable(f)]
+    if unusable:
+        print(f"[!] Never drawn with this clang: {' '.join(unusable)}")
 
-        results = collect_results(projects)
-        dataset.append({"flags": flags_str, "results": results})
+    batches: "queue.Queue[Optional[Batch]]" = queue.Queue()
+    in_flight = threading.Semaphore(opts.queue_depth + 1)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    builder = threading.Thread(
+        target=producer,
+        args=(projects, opts, batches, in_flight, stop, seen, oracle, errors),
+        daemon=True,
+    )
+    builder.start()
 
-        with open(OUTPUT_DATASET_FILE, "w") as f:
-            json.dump(dataset, f, indent=2)
+    # Measure stage: configurations are measured strictly in build order,
+    # one at a time, on the bench CPUs.
+    batch = None
+    drained = False
+    try:
+        while done < opts.iterations:
+            batch = batches.get()
+            if batch is None:
+                drained = True
+                break
+            batch.built.wait()
+            if errors:
+                break
+            if batch.failed:
+                batch.report_failures()
+                batch.abort()
+                print("[!] Skipping this flag set, will try another one...")
+                in_flight.release()
+                continue
+
+            print(f"[measure] config {batch.index} ({done + 1}/{opts.iterations})")
+            batch.open_gate()
+            if not batch.wait():
+                batch.report_failures()
+                print("[!] Skipping this flag set, will try another one...")
+                in_flight.release()
+                continue
 
-        i += 1
+            results = collect_results(projects, batch.results_dir)
+            store.append({"flags": batch.flags_str, "results": results})
+            done += 1
+            if done >= opts.iterations:
+                stop.set()
+            in_flight.release()
+            batch = None
+    except BaseException:
+        # the configuration being measured would otherwise keep running and
+        # leave partial results behind
+        if batch is not None:
+            batch.abort(kill=True)
+            batch = None
+        raise
+    finally:
+        # configurations built ahead are no longer needed; none of them was
+        # measured, so builds still running are killed rather than awaited
+        stop.set()
+        if batch is not None:
+            batch.abort(kill=True)
+        while not drained:
+            batch = batches.get()
+            if batch is None:
+                break
+            batch.built.wait()
+            batch.abort(kill=True)
+            in_flight.release()
+    if errors:
+        raise errors[0]
 
-    print(f"Dataset saved to {OUTPUT_DATASET_FILE}")
+    print(f"Dataset saved to {opts.output}")
+    if opts.export:
+        print(f"Columnar export: {export_columnar(opts.output, opts.export)}")
 
 
 if __name__ == "__main__":
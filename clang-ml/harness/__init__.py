@@ -0,0 +1,28 @@
+"""
+Shared build-and-benchmark harness for the dataset-run/*/build_and_test.py
+plugins.
+
+A plugin subclasses Project (how to configure and build the project with a
+flag set, which benches to run and how) and calls main() with it; pinning,
+the build cache, warmups, adaptive repetitions (harness.stats), in-process
+region timings (dataset-bench/include/bench.h), the native spawn driver for
+command-line tools (spawn_bench.c, Project.spawn_command), timeouts, reuse
+of samples from identical binaries and the results file are handled here,
+the same way for every project. The command line (--clang, --runs,
+--max-runs, --target-ci, --budget, -- <flags>) is the one get-data.py
+drives.
+"""
+
+from .project import ROOT_DIR, Bench, Project, run_command
+from .runner import main, measure, run_benchmarks, save_results
+
+__all__ = [
+    "ROOT_DIR",
+    "Bench",
+    "Project",
+    "run_command",
+    "main",
+    "measure",
+    "run_benchmarks",
+    "save_results",
+]
@@ -0,0 +1,196 @@
+import contextlib
+import hashlib
+import inspect
+import os
+import shlex
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import workspace
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SPAWN_SRC = Path(__file__).resolve().with_name("spawn_bench.c")
+
+
+def run_command(
+    cmd: List[str], cwd: Path = None, env: Dict[str, str] = None
+) -> subprocess.CompletedProcess:
+    print(f"[CMD] CWD: {cwd} | {' '.join(map(str, cmd))}")
+    return subprocess.run(
+        [str(c) for c in cmd],
+        cwd=cwd,
+        env=env,
+        check=True,
+        text=True,
+        capture_output=True,
+    )
+
+
+@dataclass
+class Bench:
+    """One timed command.
+
+    binary is what `bytes` reports; files identify the measured code for
+    sample reuse (binary_identity) and default to the binary alone; scratch
+    is removed once the bench is measured.
+    """
+
+    name: str
+    command: List[str]
+    binary: Path
+    files: List[Path] = field(default_factory=list)
+    cwd: Optional[Path] = None
+    env: Optional[Dict[str, str]] = None
+    input: Optional[str] = None
+    scratch: Optional[Path] = None
+
+    def __post_init__(self):
+        self.command = [str(c) for c in self.command]
+        if not self.files:
+            self.files = [self.binary]
+
+
+class Project:
+    """A dataset project: how to build it with a flag set and what to time.
+
+    Subclasses set `name` and implement build(); configure(), benches(),
+    run_bench() and session() have defaults that fit a project whose bench
+    executables run without arguments. Everything else (pinning, caching,
+    warmups, repetitions, timeouts, sample reuse, results) is done by
+    harness.main().
+    """
+
+    name = ""
+    default_runs = 3
+
+    def __init__(self, clang: str, flags: List[str], root: Path = ROOT_DIR):
+        self.clang = clang
+        self.flags = flags
+        self.root = root
+        work = workspace.work_dir(root)
+        self.src = root / "dataset" / self.name
+        self.bench_src = root / "dataset-bench" / self.name
+        self.bench_include = root / "dataset-bench" / "include"
+        self.work_dir = work
+        self.build_dir = work / f"{self.name}-build"
+        self.install_dir = work / f"{self.name}-install"
+        self.results_dir = workspace.results_root(root) / self.name
+
+    @property
+    def env(self) -> Dict[str, str]:
+        env = os.environ.copy()
+        env["CC"] = self.clang
+        env["CFLAGS"] = " ".join(self.flags)
+        return env
+
+    # -- plugin interface ---------------------------------------------------
+
+    def configure(self):
+        pass
+
+    def build(self) -> List[Path]:
+        raise NotImplementedError
+
+    def benches(self, executables: List[Path]) -> Iterable[Bench]:
+        for exe in executables:
+            yield Bench(exe.name, [exe], exe)
+
+    def run_bench(self, bench: Bench, timeout: Optional[float] = None) -> str:
+        # stdout carries the bench.h region timings, if the bench has any
+        return subprocess.run(
+            bench.command,
+            cwd=bench.cwd,
+            env=bench.env,
+            input=bench.input,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+            timeout=timeout,
+        ).stdout
+
+    @contextlib.contextmanager
+    def session(self, executables: List[Path]) -> Iterator[None]:
+        # wraps the whole measurement, e.g. a server the benches talk to
+        yield
+
+    # -- build inputs and outputs -------------------------------------------
+
+    def cache_inputs(self) -> List[Path]:
+        return [self.src, self.bench_src, self.bench_include]
+
+    def recipe_files(self) -> List[Path]:
+        # how the inputs are built: the plugin and the harness, keyed into
+        # the build cache so a changed recipe never restores old artifacts
+        harness = Path(__file__).resolve().parent
+        return [
+            Path(inspect.getfile(type(self))).resolve(),
+            *sorted(harness.glob("*.py")),
+            *sorted(harness.glob("*.c")),
+        ]
+
+    def runtime_dirs(self) -> List[Path]:
+        # restored next to the executables on a build cache hit
+        return []
+
+    def scratch_dirs(self) -> List[Path]:
+        # wiped before the build and after the measurement
+        return [self.build_dir, self.install_dir]
+
+    # -- helpers -------------------------------------------------------------
+
+    def cc(self, *args, cwd: Path = None, env: Dict[str, str] = None):
+        return run_command([self.clang, *self.flags, *args], cwd=cwd, env=env)
+
+    def compile_benches(
+        self,
+        sources: Optional[Sequence[Path]] = None,
+        cflags: Sequence[str] = (),
+        libs: Sequence[str] = (),
+        out_dir: Optional[Path] = None,
+        env: Dict[str, str] = None,
+    ) -> List[Path]:
+        if sources is None:
+            sources = sorted(self.bench_src.glob("*_bench.c"))
+        out_dir = out_dir or self.build_dir
+        out_dir.mkdir(parents=True, exist_ok=True)
+        executables = []
+        for src in sources:
+            exe = out_dir / src.stem
+            self.cc(f"-I{self.bench_include}", *cflags, src, "-o", exe, *libs, env=env)
+            executables.append(exe)
+        return executables
+
+    def copy_tree(self, src: Path, dst: Path, **kwargs):
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.copytree(src, dst, symlinks=True, **kwargs)
+
+    def config_flags(self, *cmd: str, env: Dict[str, str] = None) -> List[str]:
+        # output of pkg-config / *-config, split into arguments
+        return run_command(list(cmd), env=env).stdout.split()
+
+    def spawn_driver(self) -> Path:
+        # the driver is part of the harness, not of the measured build: it
+        # is compiled with the host cc and without the flags under test
+        digest = hashlib.sha256(SPAWN_SRC.read_bytes()).hexdigest()[:12]
+        exe = self.work_dir / f"spawn_bench-{digest}"
+        if not exe.exists():
+            self.work_dir.mkdir(parents=True, exist_ok=True)
+            tmp = exe.with_suffix(f".{os.getpid()}.tmp")
+            run_command([os.environ.get("HOST_CC", "cc"), "-O2", SPAWN_SRC, "-o", tmp])
+            os.replace(tmp, exe)
+        return exe
+
+    def spawn_command(self, spec: Path, **subst: str) -> List[str]:
+        # a .spec file holds the driver's arguments, e.g.
+        # `-n 500 -- ./cat small.txt`; {name} fields are filled from subst
+        lines = [
+            line
+            for line in spec.read_text().splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+        args = shlex.split(" ".join(lines).format(**subst))
+        return [str(self.spawn_driver()), "-p", spec.stem, *args]
@@ -0,0 +1,244 @@
+import argparse
+import datetime
+import json
+import math
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Type
+
+import binary_identity
+import build_cache
+import workspace
+
+from . import stats
+from .project import Bench, Project
+
+# one line per measured region, printed by dataset-bench/include/bench.h
+# and by the spawn driver (harness/spawn_bench.c)
+REGION_RE = re.compile(
+    r"^@bench phase=(\S+) ns_per_op=(\S+) ops=\d+ iters=\d+ ns=(\S+)$", re.M
+)
+# one line per invocation by the spawn driver, with its rusage
+SPAWN_RE = re.compile(
+    r"^@spawn run=\d+ wall_ns=\d+ user_ns=(\d+) sys_ns=(\d+) maxrss_kb=(\d+) ",
+    re.M,
+)
+
+
+def parse_arguments(project_cls: Type[Project]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=f"Build and benchmark {project_cls.name}."
+    )
+    parser.add_argument(
+        "--clang", default="clang", help="Path to the clang executable."
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=project_cls.default_runs,
+        help="Minimum number of timed runs for each benchmark.",
+    )
+    parser.add_argument(
+        "--max-runs", type=int, default=50, help="Upper bound on timed runs."
+    )
+    parser.add_argument(
+        "--target-ci",
+        type=float,
+        default=0.01,
+        help="Stop once the 95%% CI half-width of the median is below this "
+        "fraction of the median.",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=60.0,
+        help="Seconds of timed runs per benchmark after which it stops anyway.",
+    )
+    parser.add_argument(
+        "--warmups", type=int, default=1, help="Untimed runs before the timed ones."
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds after which a single run counts as failed.",
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep build dirs after measuring."
+    )
+    parser.add_argument(
+        "flags", nargs=argparse.REMAINDER, help="Clang compiler flags (prefix with --)."
+    )
+    args = parser.parse_args()
+    args.flags = [flag for flag in args.flags if flag != "--"]
+    return args
+
+
+def _enough(timings: List[float], opts: argparse.Namespace, spent: float) -> bool:
+    if len(timings) < opts.runs:
+        return False
+    if len(timings) >= max(opts.max_runs, opts.runs) or spent >= opts.budget:
+        return True
+    kept, _ = stats.reject_outliers(timings)
+    return stats.relative_ci(kept) <= opts.target_ci
+
+
+def measure(
+    project: Project, bench: Bench, opts: argparse.Namespace
+) -> Tuple[List[float], Dict[str, Any]]:
+    # Adaptive: at least --runs timed runs, then more until the median is
+    # known to --target-ci, or --max-runs / --budget is reached. Samples of
+    # an identical earlier binary count, so a stable bench may need none.
+    # A run's time is the sum of its bench.h regions when it prints any, so
+    # process start and setup are left out; otherwise it is the wall time.
+    # Benches driven by spawn_bench report the tool's wall time the same way
+    # and add user/sys CPU and max RSS per invocation.
+    samples = binary_identity.Samples(bench.name, bench.files)
+    timings = samples.samples()
+    phases: Dict[str, List[float]] = {}
+    rusage: List[Tuple[int, ...]] = []
+    spent = 0.0
+    warm = False
+    while not _enough(timings, opts, spent):
+        if not warm:
+            for _ in range(opts.warmups):
+                project.run_bench(bench, opts.timeout)
+            warm = True
+        start_time = time.perf_counter()
+        output = project.run_bench(bench, opts.timeout)
+        wall = time.perf_counter() - start_time
+        regions = REGION_RE.findall(output or "")
+        for name, ns_per_op, _ in regions:
+            phases.setdefault(name, []).append(float(ns_per_op))
+        rusage += [tuple(map(int, m)) for m in SPAWN_RE.findall(output or "")]
+        timings.append(sum(float(ns) for *_, ns in regions) / 1e9 if regions else wall)
+        spent += wall
+    meta = samples.meta
+    if len(timings) > len(samples.known):
+        meta = {"timing": "spawn" if rusage else "region" if phases else "process"}
+        if phases:
+            meta["ns_per_op"] = {k: statistics.median(v) for k, v in phases.items()}
+        if rusage:
+            user, system, rss = zip(*rusage)
+            meta["user"] = statistics.median(user) / 1e9
+            meta["sys"] = statistics.median(system) / 1e9
+            meta["maxrss_kb"] = max(rss)
+    samples.save(timings, meta)
+    return timings, meta
+
+
+def run_benchmarks(
+    project: Project, executables: List[Path], opts: argparse.Namespace
+) -> List[Dict[str, Any]]:
+    results = []
+    print(
+        f"\n[*] Running benchmarks ({opts.runs}-{opts.max_runs} runs, "
+        f"target CI {opts.target_ci:.1%}, budget {opts.budget:g}s each)..."
+    )
+    for bench in project.benches(executables):
+        try:
+            timings, meta = measure(project, bench, opts)
+            summary = stats.summarize(timings)
+            binary_size = bench.binary.stat().st_size
+            results.append(
+                {"bench": bench.name, "bytes": binary_size, **summary, **meta}
+            )
+            ci = summary["ci"]
+            print(
+                f"  - {bench.name:<35} {binary_size:8d} bytes, "
+                f"{summary['median']:.6f}s median "
+                f"[{summary['p10']:.6f}, {summary['p90']:.6f}] "
+                f"±{ci:.1%} n={summary['runs']}"
+                + (f" ({summary['rejected']} outliers)" if summary["rejected"] else "")
+                + (f" ({meta['timing']})" if meta.get("timing") != "process" else "")
+            )
+        except (
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            FileNotFoundError,
+        ) as e:
+            print(f"[ERROR] Failed to run benchmark {bench.name}: {e}")
+            if getattr(e, "stderr", None):
+                print(e.stderr)
+        finally:
+            if bench.scratch:
+                shutil.rmtree(bench.scratch, ignore_errors=True)
+    return results
+
+
+def save_results(results: List[Dict[str, Any]], results_dir: Path):
+    if not results:
+        print("[WARN] No results to save.")
+        return
+    results_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = results_dir / f"results_{timestamp}.json"
+    with open(output_file, "w") as f:
+        # inf is not JSON
+        json.dump(
+            [
+                {k: (None if v == math.inf else v) for k, v in r.items()}
+                for r in results
+            ],
+            f,
+            indent=2,
+        )
+    print(f"\n[SUCCESS] Results saved to {output_file}")
+
+
+def _build(project: Project) -> List[Path]:
+    project.configure()
+    executables = project.build()
+    if not executables:
+        raise RuntimeError("Build process failed or produced no executables.")
+    return executables
+
+
+def main(project_cls: Type[Project]):
+    args = parse_arguments(project_cls)
+    workspace.pin_build()
+    project = project_cls(args.clang, args.flags)
+
+    print(f"[*] Project:      {project.name}")
+    print(f"[*] Build dir:    {project.build_dir}")
+    print(f"[*] Clang flags:  {' '.join(args.flags) or '(none)'}")
+
+    for d in project.scratch_dirs():
+        shutil.rmtree(d, ignore_errors=True)
+    project.build_dir.mkdir(parents=True)
+
+    try:
+        executables = build_cache.cached_build(
+            project.name,
+            project.cache_inputs(),
+            args.clang,
+            args.flags,
+            lambda: _build(project),
+            project.build_dir,
+            dirs=project.runtime_dirs(),
+            recipe=project.recipe_files(),
+        )
+        with workspace.bench_slot(), project.session(executables):
+            results = run_benchmarks(project, executables, args)
+        save_results(results, project.results_dir)
+    except (subprocess.CalledProcessError, RuntimeError) as e:
+        print(f"\n[FATAL ERROR] An error occurred during the process.")
+        if getattr(e, "stderr", None):
+            print(
+                "------- STDERR -------\n"
+                + e.stderr.strip()
+                + "\n----------------------"
+            )
+        else:
+            print(e)
+        sys.exit(1)
+    finally:
+        if not args.keep:
+            print(f"[*] Cleaning up build directories...")
+            for d in project.scratch_dirs():
+                shutil.rmtree(d, ignore_errors=True)
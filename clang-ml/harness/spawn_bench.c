@@ -0,0 +1,127 @@
+/*
+ * Native spawn driver for benches that time a command-line tool.
+ *
+ *	spawn_bench [-n runs] [-p phase] [-q] -- prog [args...]
+ *
+ * Runs prog `runs` times with posix_spawnp + wait4, stdout (and with -q
+ * stderr) on /dev/null, so neither an interpreter nor fork of a large
+ * parent is inside the samples. Per invocation it prints
+ *
+ *	@spawn run=<i> wall_ns=<n> user_ns=<n> sys_ns=<n> maxrss_kb=<n> status=<s>
+ *
+ * and at the end one bench.h region line with the total wall time, which
+ * the harness reads like any in-process region. A non-zero exit status is
+ * reported but accepted (some benches expect it); a child killed by a
+ * signal or a failed spawn fails the driver.
+ */
+#define _GNU_SOURCE
+#include <errno.h>
+#include <fcntl.h>
+#include <spawn.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+#include <sys/wait.h>
+#include <time.h>
+#include <unistd.h>
+
+extern char **environ;
+
+static uint64_t
+now_ns(void)
+{
+	struct timespec ts;
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return (uint64_t)ts.tv_sec * 1000000000u + (uint64_t)ts.tv_nsec;
+}
+
+static uint64_t
+tv_ns(struct timeval tv)
+{
+	return (uint64_t)tv.tv_sec * 1000000000u + (uint64_t)tv.tv_usec * 1000u;
+}
+
+static void
+usage(const char *argv0)
+{
+	fprintf(stderr, "usage: %s [-n runs] [-p phase] [-q] -- prog [args...]\n",
+	        argv0);
+	exit(2);
+}
+
+int
+main(int argc, char *argv[])
+{
+	long        runs  = 1;
+	const char *phase = "spawn";
+	int         quiet = 0;
+	int         opt;
+
+	while ((opt = getopt(argc, argv, "n:p:q")) != -1) {
+		switch (opt) {
+		case 'n':
+			runs = strtol(optarg, NULL, 10);
+			break;
+		case 'p':
+			phase = optarg;
+			break;
+		case 'q':
+			quiet = 1;
+			break;
+		default:
+			usage(argv[0]);
+		}
+	}
+	if (optind >= argc || runs < 1)
+		usage(argv[0]);
+	char **cmd = argv + optind;
+
+	posix_spawn_file_actions_t actions;
+	posix_spawn_file_actions_init(&actions);
+	posix_spawn_file_actions_addopen(&actions, STDOUT_FILENO, "/dev/null",
+	                                 O_WRONLY, 0);
+	if (quiet)
+		posix_spawn_file_actions_addopen(&actions, STDERR_FILENO,
+		                                 "/dev/null", O_WRONLY, 0);
+
+	uint64_t total = 0;
+	for (long i = 0; i < runs; i++) {
+		pid_t         pid;
+		int           status;
+		struct rusage ru;
+
+		uint64_t      start = now_ns();
+		int err = posix_spawnp(&pid, cmd[0], &actions, NULL, cmd, environ);
+		if (err) {
+			fprintf(stderr, "spawn_bench: %s: %s\n", cmd[0], strerror(err));
+			return 127;
+		}
+		while (wait4(pid, &status, 0, &ru) < 0) {
+			if (errno != EINTR) {
+				perror("spawn_bench: wait4");
+				return 1;
+			}
+		}
+		uint64_t wall = now_ns() - start;
+		total += wall;
+
+		if (WIFSIGNALED(status)) {
+			fprintf(stderr, "spawn_bench: %s killed by signal %d\n", cmd[0],
+			        WTERMSIG(status));
+			return 1;
+		}
+		printf("@spawn run=%ld wall_ns=%llu user_ns=%llu sys_ns=%llu "
+		       "maxrss_kb=%ld status=%d\n",
+		       i, (unsigned long long)wall,
+		       (unsigned long long)tv_ns(ru.ru_utime),
+		       (unsigned long long)tv_ns(ru.ru_stime), ru.ru_maxrss,
+		       WEXITSTATUS(status));
+	}
+	posix_spawn_file_actions_destroy(&actions);
+
+	printf("@bench phase=%s ns_per_op=%.3f ops=%ld iters=1 ns=%llu\n", phase,
+	       (double)total / runs, runs, (unsigned long long)total);
+	return 0;
+}
@@ -0,0 +1,64 @@
+import math
+import statistics
+from typing import Dict, List, Sequence, Tuple
+
+Z95 = 1.959964
+# modified z-score cutoff (Iglewicz & Hoaglin); 0.6745 makes the MAD a
+# consistent estimate of the standard deviation for normal data
+MAD_THRESHOLD = 3.5
+
+
+def reject_outliers(
+    samples: Sequence[float], threshold: float = MAD_THRESHOLD
+) -> Tuple[List[float], List[float]]:
+    med = statistics.median(samples)
+    mad = statistics.median(abs(s - med) for s in samples)
+    if mad == 0:
+        return list(samples), []
+    kept, rejected = [], []
+    for s in samples:
+        (kept if 0.6745 * abs(s - med) / mad <= threshold else rejected).append(s)
+    return kept, rejected
+
+
+def quantile(samples: Sequence[float], q: float) -> float:
+    x = sorted(samples)
+    pos = q * (len(x) - 1)
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(x) - 1)
+    return x[lo] + (x[hi] - x[lo]) * (pos - lo)
+
+
+def median_ci(samples: Sequence[float], z: float = Z95) -> Tuple[float, float]:
+    # distribution-free: order statistics around n/2 from the binomial
+    # (normal approximation), no assumption on the timing distribution
+    x = sorted(samples)
+    n = len(x)
+    half = z * math.sqrt(n) / 2
+    lo = max(math.floor(n / 2 - half), 1)
+    hi = min(math.ceil(1 + n / 2 + half), n)
+    return x[lo - 1], x[hi - 1]
+
+
+def relative_ci(samples: Sequence[float]) -> float:
+    """Half-width of the 95% CI of the median, relative to the median."""
+    if len(samples) < 2:
+        return math.inf
+    lo, hi = median_ci(samples)
+    med = statistics.median(samples)
+    return (hi - lo) / 2 / med if med > 0 else math.inf
+
+
+def summarize(samples: Sequence[float]) -> Dict:
+    kept, rejected = reject_outliers(samples)
+    return {
+        "seconds": statistics.median(kept),
+        "median": statistics.median(kept),
+        "p10": quantile(kept, 0.1),
+        "p90": quantile(kept, 0.9),
+        "mean": statistics.mean(kept),
+        "ci": relative_ci(kept),
+        "runs": len(samples),
+        "rejected": len(rejected),
+        "samples": list(samples),
+    }
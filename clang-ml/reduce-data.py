@@ -1,18 +1,11 @@
-import pandas as pd
-import json
+import sys
 
-with open("results.json") as f:
-    data = json.load(f)
+from dataset_store import load_tables
 
-rows = []
-for entry in data:
-    flags = entry["flags"].split()
-    results = entry["results"]
+# results.json by default; any .json/.jsonl dataset or .npz/.parquet export
+flags, long = load_tables(sys.argv[1:] or ["results.json"])
 
-    total_time = sum(b["seconds"] for benches in results.values() for b in benches)
-
-    row = {"flags": entry["flags"], "target": total_time}
-    rows.append(row)
-
-df = pd.DataFrame(rows)
+totals = long.groupby("config")["seconds"].sum()
+df = totals.reindex(range(len(flags)), fill_value=0.0).to_frame("target")
+df.insert(0, "flags", flags)
 print(df)
@@ -0,0 +1,128 @@
+"""
+Per-worker environment shared by the dataset-run/*/build_and_test.py scripts.
+
+get-data.py runs several projects at once. Each project process gets its own
+work directory (build trees, deps_install) and results root, a CPU set for
+compiling, and a pool of measurement slots (disjoint CPU sets guarded by
+lock files) so that benchmarks never share cores with builds or with each
+other. Without the variables every script behaves as before.
+
+  CLANG_ML_WORK_DIR     root for build/install dirs (default <root>/dataset)
+  CLANG_ML_RESULTS_DIR  root for results/<project> (default <root>/results)
+  CLANG_ML_BUILD_CPUS   CPU list for builds, e.g. "0-7"
+  CLANG_ML_BENCH_SLOTS  measurement slots, e.g. "8-9;10-11"
+  CLANG_ML_LOCK_DIR     where the slot lock files live
+  CLANG_ML_JOBS         parallel build jobs (default: CPUs in the build set)
+  CLANG_ML_BUILT_MARKER file touched once the build is done
+  CLANG_ML_BENCH_GATE   file that must exist before measuring starts;
+                        "abort" in it cancels the measurement
+
+The last two let get-data.py pipeline configurations: a finished build
+parks in bench_slot() with its artifacts until the scheduler opens the gate
+for its configuration.
+"""
+
+import contextlib
+import fcntl
+import os
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Set
+
+
+def parse_cpus(spec: str) -> Set[int]:
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.update(range(int(lo), int(hi) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def format_cpus(cpus) -> str:
+    return ",".join(str(c) for c in sorted(cpus))
+
+
+def work_dir(root_dir: Path) -> Path:
+    return Path(os.environ.get("CLANG_ML_WORK_DIR", root_dir / "dataset"))
+
+
+def results_root(root_dir: Path) -> Path:
+    return Path(os.environ.get("CLANG_ML_RESULTS_DIR", root_dir / "results"))
+
+
+def pin(cpus: Optional[Set[int]]):
+    # inherited by every child, so make/clang and the benches follow
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+def pin_build():
+    spec = os.environ.get("CLANG_ML_BUILD_CPUS")
+    if spec:
+        pin(parse_cpus(spec))
+
+
+def jobs() -> str:
+    if "CLANG_ML_JOBS" in os.environ:
+        return os.environ["CLANG_ML_JOBS"]
+    if hasattr(os, "sched_getaffinity"):
+        return str(len(os.sched_getaffinity(0)))
+    return str(os.cpu_count() or 1)
+
+
+def bench_slots() -> List[Set[int]]:
+    spec = os.environ.get("CLANG_ML_BENCH_SLOTS", "")
+    return [parse_cpus(s) for s in spec.split(";") if s.strip()]
+
+
+def wait_for_gate(poll: float = 0.5):
+    marker = os.environ.get("CLANG_ML_BUILT_MARKER")
+    if marker:
+        Path(marker).touch()
+    gate = os.environ.get("CLANG_ML_BENCH_GATE")
+    if not gate:
+        return
+    while not os.path.exists(gate):
+        time.sleep(poll)
+    if Path(gate).read_text().strip() == "abort":
+        raise RuntimeError("Measurement cancelled by the scheduler.")
+
+
+@contextlib.contextmanager
+def bench_slot(poll: float = 0.5) -> Iterator[Optional[Set[int]]]:
+    # Waits for the scheduler's gate, then blocks until one measurement slot
+    # is free, pins the process to it and holds its lock until the block
+    # exits. flock is released by the kernel if the process dies, so a
+    # crashed project never wedges the pool.
+    wait_for_gate(poll)
+    slots = bench_slots()
+    if not slots:
+        yield None
+        return
+    lock_dir = Path(os.environ.get("CLANG_ML_LOCK_DIR", work_dir(Path.cwd())))
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    previous = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+    while True:
+        for i, cpus in enumerate(slots):
+            f = open(lock_dir / f"bench-slot-{i}.lock", "w")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                continue
+            try:
+                print(f"[*] Measuring on CPUs {format_cpus(cpus)} (slot {i})")
+                pin(cpus)
+                yield cpus
+            finally:
+                pin(previous)
+                fcntl.flock(f, fcntl.LOCK_UN)
+                f.close()
+            return
+        time.sleep(poll)
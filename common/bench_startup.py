@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def wall(cmd, cwd, env, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - t0)
+    return min(samples), statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Startup and end-to-end wall time of the task scripts."
+    )
+    parser.add_argument("--tasks", nargs="+", default=["task_2", "task_3", "task_4"])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    py = sys.executable
+    # Agg turns plt.show() into a no-op, so "inline" is the old in-process
+    # plotting path without a window to close
+    env = {**os.environ, "MPLBACKEND": "Agg"}
+    print(f"{'task':<8} {'mode':<10} {'min_s':>8} {'median_s':>9}")
+    for task in args.tasks:
+        cwd = ROOT / task
+        with tempfile.TemporaryDirectory() as plot_dir:
+            modes = {
+                "import": [py, "-c", "import main"],
+                "no-plots": [py, "main.py", "--no-plots"],
+                "plot-dir": [py, "main.py", "--plot-dir", plot_dir],
+                "inline": [py, "main.py"],
+            }
+            # first run warms the dataset cache and the page cache
+            subprocess.run(
+                modes["no-plots"],
+                cwd=cwd,
+                env=env,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            for mode, cmd in modes.items():
+                lo, med = wall(cmd, cwd, env, args.runs)
+                print(f"{task:<8} {mode:<10} {lo:8.3f} {med:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
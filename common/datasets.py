@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+CACHE_VERSION = 1
+CACHE_DIR = Path(
+    os.environ.get("EDU_ML_CACHE", Path(__file__).resolve().parents[1] / ".cache")
+)
+
+
+def _fetch(name):
+    # sklearn is imported only on a cache miss
+    if name == "california_housing":
+        from sklearn.datasets import fetch_california_housing as loader
+    elif name == "breast_cancer":
+        from sklearn.datasets import load_breast_cancer as loader
+    elif name == "digits":
+        from sklearn.datasets import load_digits as loader
+    else:
+        raise ValueError(f"unknown dataset: {name}")
+    raw = loader()
+    names = [str(f) for f in raw.feature_names]
+    return np.asarray(raw.data), np.asarray(raw.target), names
+
+
+def _build(name, params):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.model_selection import train_test_split
+
+    X, y, names = _fetch(name)
+    if np.isnan(X).any():
+        raise ValueError(f"{name}: found missing values")
+    X = X.astype(params["dtype"])
+    if params["signed_labels"]:
+        y = np.where(y == 0, -1, 1)
+    elif params["y_dtype"]:
+        y = y.astype(params["y_dtype"])
+    if params["y_column"]:
+        y = y.reshape(-1, 1)
+
+    arrays = {}
+    if params["test_size"]:
+        X_tr, X_te, y_tr, y_te = train_test_split(
+            X,
+            y,
+            test_size=params["test_size"],
+            random_state=params["random_state"],
+            stratify=y if params["stratify"] else None,
+        )
+        if params["scale"] == "all":
+            scaler = StandardScaler().fit(X)
+        elif params["scale"] == "train":
+            scaler = StandardScaler().fit(X_tr)
+        if params["scale"]:
+            X_tr, X_te = scaler.transform(X_tr), scaler.transform(X_te)
+        splits = {"X_train": X_tr, "X_test": X_te, "y_train": y_tr, "y_test": y_te}
+    else:
+        if params["scale"]:
+            scaler = StandardScaler().fit(X)
+            X = scaler.transform(X)
+        splits = {"X": X, "y": y}
+
+    for key, arr in splits.items():
+        if key.startswith("X") and params["bias"]:
+            arr = np.hstack([np.ones((arr.shape[0], 1), dtype=arr.dtype), arr])
+        arrays[key] = np.ascontiguousarray(arr)
+    if params["scale"]:
+        arrays["mean"] = scaler.mean_.astype(params["dtype"])
+        arrays["scale"] = scaler.scale_.astype(params["dtype"])
+    if params["bias"]:
+        names = ["Bias"] + names
+    return arrays, {"feature_names": names}
+
+
+def cache_key(name, params):
+    blob = json.dumps([CACHE_VERSION, name, params], sort_keys=True)
+    return f"{name}-{hashlib.sha1(blob.encode()).hexdigest()[:16]}"
+
+
+def load(
+    name,
+    scale="all",
+    test_size=None,
+    random_state=42,
+    stratify=False,
+    bias=False,
+    dtype="float64",
+    y_dtype=None,
+    y_column=False,
+    signed_labels=False,
+    refresh=False,
+):
+    # Preprocessed arrays are materialized once per parameter set as .npy
+    # files and then opened copy-on-write with mmap, so a warm start neither
+    # imports sklearn nor copies data. scale is "all" (fit on every row),
+    # "train" (fit on the train split) or None.
+    params = {
+        "scale": scale,
+        "test_size": test_size,
+        "random_state": random_state,
+        "stratify": stratify,
+        "bias": bias,
+        "dtype": np.dtype(dtype).name,
+        "y_dtype": np.dtype(y_dtype).name if y_dtype else None,
+        "y_column": y_column,
+        "signed_labels": signed_labels,
+    }
+    path = CACHE_DIR / cache_key(name, params)
+    if refresh or not (path / "meta.json").exists():
+        arrays, meta = _build(name, params)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # build next to the target and rename, so concurrent runs never see
+        # a half-written entry
+        tmp = Path(tempfile.mkdtemp(dir=CACHE_DIR, prefix=".tmp-"))
+        for key, arr in arrays.items():
+            np.save(tmp / f"{key}.npy", arr)
+        meta = {**meta, "arrays": sorted(arrays), "params": params}
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # another run won the race; its entry is identical
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    meta = json.loads((path / "meta.json").read_text())
+    data = {key: np.load(path / f"{key}.npy", mmap_mode="c") for key in meta["arrays"]}
+    return SimpleNamespace(feature_names=meta["feature_names"], **data)
@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import json
+
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+# Saved models are plain .npz files: the fitted parameters in the scaled
+# feature space plus the scaler mean/scale, so raw rows can be scored with
+# numpy alone (no sklearn or torch import on the prediction path).
+KINDS = ("linear", "svm", "kmeans")
+
+
+@dataclass
+class Model:
+    kind: str
+    params: dict
+    mean: np.ndarray = None
+    scale: np.ndarray = None
+    meta: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"unknown model kind {self.kind!r}, expected {KINDS}")
+        self._fused = None
+
+    def save(self, path):
+        arrays = {f"param_{k}": np.asarray(v) for k, v in self.params.items()}
+        if self.mean is not None:
+            arrays["mean"], arrays["scale"] = self.mean, self.scale
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                kind=np.array(self.kind),
+                meta=np.array(json.dumps(self.meta)),
+                **arrays,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            params = {k[6:]: z[k] for k in z.files if k.startswith("param_")}
+            return cls(
+                kind=str(z["kind"]),
+                params=params,
+                mean=z["mean"] if "mean" in z.files else None,
+                scale=z["scale"] if "scale" in z.files else None,
+                meta=json.loads(str(z["meta"])),
+            )
+
+    def _fuse(self):
+        # Fold the scaler into the weights once, so each chunk costs a
+        # single GEMM on raw rows: with z = (x - mean) / scale,
+        #   z @ w + b      = x @ (w / scale) + (b - mean @ (w / scale))
+        #   ||z - c||^2    = ||z||^2 - 2 x @ (c / scale) + (||c||^2
+        #                    + 2 mean @ (c / scale)), and ||z||^2 drops
+        #                    out of the argmin
+        if self.kind == "kmeans":
+            C = self.params["centroids"].astype(np.float64)
+            d = C.shape[1]
+        else:
+            d = self.params["coef"].shape[0]
+        # an unscaled model is the identity scaler
+        mean = np.zeros(d) if self.mean is None else self.mean.astype(np.float64)
+        scale = np.ones(d) if self.scale is None else self.scale.astype(np.float64)
+        if self.kind == "kmeans":
+            W = (C / scale).T
+            b = (C * C).sum(axis=1) + 2 * (mean @ W)
+            return -2 * W, b
+        W = self.params["coef"].astype(np.float64)
+        W = W / (scale[:, None] if W.ndim == 2 else scale)
+        return W, self.params["intercept"] - mean @ W
+
+    def decision_function(self, X):
+        if self._fused is None:
+            self._fused = self._fuse()
+        W, b = self._fused
+        return np.asarray(X) @ W + b
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if self.kind == "kmeans":
+            return scores.argmin(axis=1)
+        if self.kind == "svm":
+            return np.sign(scores)
+        return scores
+
+    def predict_file(self, src, out=None, chunk_rows=1 << 16, skip_header=0):
+        # Streams src (.npy via mmap, else delimited text) through predict()
+        # chunk by chunk. Returns the predictions, or writes them to out
+        # (.npy, else text) and returns the path.
+        chunks = (self.predict(c) for c in iter_chunks(src, chunk_rows, skip_header))
+        if out is None:
+            return np.concatenate(list(chunks))
+        out = Path(out)
+        if out.suffix == ".npy":
+            # the .npy header needs the row count up front; for text input
+            # that costs one extra read, but no prediction is held in memory
+            n = count_rows(src, skip_header)
+            dest, s = None, 0
+            for pred in chunks:
+                if dest is None:
+                    dest = np.lib.format.open_memmap(
+                        out, mode="w+", dtype=pred.dtype, shape=(n,) + pred.shape[1:]
+                    )
+                dest[s : s + len(pred)] = pred
+                s += len(pred)
+            if s != n:
+                raise ValueError(f"{src}: counted {n} rows but read {s}")
+            if dest is not None:
+                dest.flush()
+        else:
+            with open(out, "w") as f:
+                for pred in chunks:
+                    np.savetxt(f, pred, fmt="%.10g", delimiter=",")
+        return out
+
+
+def count_rows(src, skip_header=0):
+    # the rows iter_chunks() yields: np.loadtxt skips blank and comment lines
+    src = Path(src)
+    if src.suffix == ".npy":
+        return np.load(src, mmap_mode="r").shape[0]
+    with open(src) as f:
+        for _ in range(skip_header):
+            next(f)
+        return sum(1 for line in f if line.split("#", 1)[0].strip())
+
+
+def iter_chunks(src, chunk_rows=1 << 16, skip_header=0):
+    src = Path(src)
+    if src.suffix == ".npy":
+        X = np.load(src, mmap_mode="r")
+        for s in range(0, X.shape[0], chunk_rows):
+            yield X[s : s + chunk_rows]
+        return
+    with open(src) as f:
+        for _ in range(skip_header):
+            next(f)
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=",", ndmin=2)
+
+
+def linear(coef, intercept, mean=None, scale=None, **meta):
+    return Model(
+        "linear", {"coef": coef, "intercept": np.asarray(intercept)}, mean, scale, meta
+    )
+
+
+def svm(w, b, mean=None, scale=None, **meta):
+    return Model("svm", {"coef": w, "intercept": np.asarray(b)}, mean, scale, meta)
+
+
+def kmeans(centroids, mean=None, scale=None, **meta):
+    return Model("kmeans", {"centroids": centroids}, mean, scale, meta)
+
+
+def load(path):
+    return Model.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch predictions from a model.")
+    parser.add_argument("model", type=Path)
+    parser.add_argument("input", type=Path, help=".npy or comma-separated text")
+    parser.add_argument("-o", "--out", type=Path, required=True)
+    parser.add_argument("--chunk-rows", type=int, default=1 << 16)
+    parser.add_argument("--skip-header", type=int, default=0)
+    args = parser.parse_args()
+    load(args.model).predict_file(
+        args.input, args.out, args.chunk_rows, args.skip_header
+    )
+
+
+if __name__ == "__main__":
+    main()
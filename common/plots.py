@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import multiprocessing
+import re
+
+from pathlib import Path
+
+
+def add_plot_args(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--no-plots",
+        "--metrics-only",
+        dest="no_plots",
+        action="store_true",
+        help="print the metrics only; plotting libraries are never imported",
+    )
+    group.add_argument(
+        "--plot-dir",
+        type=Path,
+        help="save figures as PNG files from a background process instead of "
+        "showing them",
+    )
+    return parser
+
+
+def _figure_name(num, fig):
+    title = fig.get_suptitle()
+    if not title and fig.axes:
+        title = fig.axes[0].get_title()
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", title).strip("_").lower()
+    return f"{num:02d}_{slug or 'figure'}.png"
+
+
+def _save_all(fn, args, kwargs, plot_dir):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plot_dir.mkdir(parents=True, exist_ok=True)
+    fn(*args, **kwargs)
+    for num in plt.get_fignums():
+        fig = plt.figure(num)
+        fig.savefig(plot_dir / _figure_name(num, fig), bbox_inches="tight")
+    plt.close("all")
+
+
+def render(opts, fn, *args, **kwargs):
+    # fn only builds figures; whether they are shown, saved or skipped is
+    # decided here. Saving runs in a separate process that the interpreter
+    # joins on exit, so the caller keeps computing and printing meanwhile.
+    if opts.no_plots:
+        return None
+    if opts.plot_dir is None:
+        import matplotlib.pyplot as plt
+
+        fn(*args, **kwargs)
+        plt.show()
+        return None
+    # spawn: the parent may hold torch/BLAS thread pools that fork would copy
+    # in an undefined state
+    ctx = multiprocessing.get_context("spawn")
+    proc = ctx.Process(target=_save_all, args=(fn, args, kwargs, opts.plot_dir))
+    proc.start()
+    return proc
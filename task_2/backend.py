@@ -0,0 +1,133 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+
+from dataclasses import dataclass
+
+import torch
+
+DTYPES = {
+    "float32": torch.float32,
+    "float64": torch.float64,
+    "bfloat16": torch.bfloat16,
+}
+DEVICES = ("auto", "cpu", "cuda", "xpu", "mps")
+
+
+def get_device(name="auto"):
+    if name != "auto":
+        return torch.device(name)
+    if torch.cuda.is_available():
+        return torch.device("cuda")
+    if hasattr(torch, "xpu") and torch.xpu.is_available():
+        return torch.device("xpu")
+    if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+        return torch.device("mps")
+    return torch.device("cpu")
+
+
+@dataclass
+class Backend:
+    device: torch.device
+    dtype: torch.dtype
+    threads: int
+    interop_threads: int
+    deterministic: bool
+
+    @property
+    def factor_dtype(self):
+        # torch.linalg has no bfloat16 factorizations; closed-form solves
+        # run in float32 and cast back
+        return torch.float32 if self.dtype == torch.bfloat16 else self.dtype
+
+    def tensor(self, arr):
+        return torch.as_tensor(arr).to(self.device, self.dtype)
+
+    @staticmethod
+    def numpy(t):
+        # numpy has no bfloat16
+        t = t.detach().cpu()
+        return (t.float() if t.dtype == torch.bfloat16 else t).numpy()
+
+    def describe(self):
+        return (
+            f"device={self.device} dtype={str(self.dtype).removeprefix('torch.')} "
+            f"threads={self.threads} interop={self.interop_threads} "
+            f"deterministic={self.deterministic}"
+        )
+
+
+def _env(name, default=None):
+    return os.environ.get(f"EDU_ML_{name}", default)
+
+
+def add_backend_args(parser):
+    # every flag falls back to an EDU_ML_* environment variable, so batch
+    # jobs can pin threads without touching the command line
+    group = parser.add_argument_group("backend")
+    group.add_argument("--device", choices=DEVICES, default=_env("DEVICE", "auto"))
+    group.add_argument(
+        "--threads",
+        type=int,
+        default=int(_env("THREADS", 0)),
+        help="intra-op threads, 0 keeps the torch default (all cores)",
+    )
+    group.add_argument(
+        "--interop-threads",
+        type=int,
+        default=int(_env("INTEROP_THREADS", 0)),
+        help="inter-op threads, 0 keeps the torch default",
+    )
+    group.add_argument(
+        "--dtype", choices=list(DTYPES), default=_env("DTYPE", "float32")
+    )
+    group.add_argument(
+        "--deterministic",
+        action="store_true",
+        default=_env("DETERMINISTIC", "0") not in ("", "0", "false"),
+        help="deterministic kernels and a fixed seed",
+    )
+    group.add_argument("--seed", type=int, default=int(_env("SEED", 0)))
+    return parser
+
+
+def configure(
+    device="auto",
+    threads=0,
+    interop_threads=0,
+    dtype="float32",
+    deterministic=False,
+    seed=0,
+):
+    # interop threads can only be set before the first parallel region, so
+    # this has to run before any tensor work in the process
+    if interop_threads:
+        torch.set_num_interop_threads(interop_threads)
+    if threads:
+        torch.set_num_threads(threads)
+    dev = get_device(device)
+    if deterministic:
+        if dev.type == "cuda":
+            # cuBLAS needs a fixed workspace to be reproducible
+            os.environ.setdefault("CUBLAS_WORKSPACE_CONFIG", ":4096:8")
+            torch.backends.cudnn.benchmark = False
+        torch.use_deterministic_algorithms(True)
+        torch.manual_seed(seed)
+    return Backend(
+        device=dev,
+        dtype=DTYPES[dtype],
+        threads=torch.get_num_threads(),
+        interop_threads=torch.get_num_interop_threads(),
+        deterministic=deterministic,
+    )
+
+
+def from_args(opts):
+    return configure(
+        device=opts.device,
+        threads=opts.threads,
+        interop_threads=opts.interop_threads,
+        dtype=opts.dtype,
+        deterministic=opts.deterministic,
+        seed=opts.seed,
+    )
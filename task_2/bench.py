@@ -0,0 +1,432 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from backend import DTYPES
+from correlation import correlation, strong_pairs, strong_pairs_chunked
+from solvers import LeastSquares, RidgePath, normal_residual
+from train import (
+    COMPILE_MODES,
+    DEFAULT_LR,
+    ChunkedDataset,
+    gram_stats,
+    train_gd,
+    train_gd_gram,
+    train_line_search,
+    train_minibatch,
+)
+
+
+def timed(fn, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def synthetic(rows, cols, dtype=torch.float32, seed=0, chunk_size=1 << 20):
+    # filled block by block so the float64 temporaries stay small
+    g = torch.Generator().manual_seed(seed)
+    X = torch.empty(rows, cols, dtype=dtype)
+    y = torch.empty(rows, 1, dtype=dtype)
+    theta = torch.randn(cols, 1, generator=g)
+    for s in range(0, rows, chunk_size):
+        Xc = torch.randn(min(chunk_size, rows - s), cols, generator=g)
+        Xc[:, 0] = 1.0
+        X[s : s + len(Xc)] = Xc
+        y[s : s + len(Xc)] = Xc @ theta + 0.1 * torch.randn(len(Xc), 1, generator=g)
+    return X, y
+
+
+def housing():
+    from main import load_data
+
+    ds = load_data()
+    return torch.from_numpy(ds.X_train), torch.from_numpy(ds.y_train)
+
+
+def bench_solvers(args):
+    datasets = {"housing": housing}
+    if args.rows:
+        datasets[f"synthetic {args.rows}x{args.cols}"] = lambda: synthetic(
+            args.rows, args.cols
+        )
+    rows = []
+    for name, load in datasets.items():
+        X, y = load()
+        # k targets and a few penalties share each factorization
+        Y = torch.cat([y + 0.01 * i for i in range(args.targets)], dim=1)
+        inv, t_inv = timed(lambda: torch.linalg.inv(X.T @ X) @ (X.T @ Y), args.repeat)
+        rows.append(
+            {
+                "data": name,
+                "method": "inv (baseline)",
+                "factor_s": t_inv,
+                "solve_s": 0.0,
+                "residual": normal_residual(X, Y, inv),
+            }
+        )
+        for method in args.methods:
+            solver, t_fac = timed(lambda: LeastSquares(X, method), args.repeat)
+            theta, t_sol = timed(
+                lambda: [solver.solve(Y, alpha) for alpha in args.alphas],
+                args.repeat,
+            )
+            rows.append(
+                {
+                    "data": name,
+                    "method": method,
+                    "factor_s": t_fac,
+                    "solve_s": t_sol / len(args.alphas),
+                    "residual": normal_residual(X, Y, solver.solve(Y)),
+                }
+            )
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda x: f"{x:.3e}"))
+
+
+def passes_to(history, target):
+    hit = np.flatnonzero(np.asarray(history) <= target)
+    return int(hit[0]) + 1 if hit.size else None
+
+
+def bench_optim(args):
+    from sklearn.model_selection import train_test_split
+
+    X, y = (t.numpy() for t in housing())
+    X_tr, X_val, y_tr, y_val = train_test_split(X, y, test_size=0.1, random_state=0)
+    if args.memmap:
+        import os
+        import tempfile
+
+        tmp = tempfile.mkdtemp()
+        np.save(os.path.join(tmp, "X.npy"), X_tr)
+        np.save(os.path.join(tmp, "y.npy"), y_tr)
+        X_tr = np.load(os.path.join(tmp, "X.npy"), mmap_mode="r")
+        y_tr = np.load(os.path.join(tmp, "y.npy"), mmap_mode="r")
+
+    Xt, yt = torch.tensor(X_tr), torch.tensor(y_tr)
+    Xv, yv = torch.from_numpy(X_val), torch.from_numpy(y_val)
+    theta_cf = LeastSquares(Xt).solve(yt)
+    # full-batch methods are judged on train MSE, mini-batch ones on the
+    # validation MSE they early-stop on
+    tr_target = torch.mean((Xt @ theta_cf - yt) ** 2).item() * (1 + args.rel_tol)
+    val_target = torch.mean((Xv @ theta_cf - yv) ** 2).item() * (1 + args.rel_tol)
+    theta0 = torch.zeros(Xt.shape[1], 1)
+
+    rows = []
+    t0 = time.perf_counter()
+    _, hist = train_gd(Xt, yt, theta0, args.alpha, args.gd_epochs)
+    rows.append(("gd", args.alpha, hist.numpy(), tr_target, time.perf_counter() - t0))
+    t0 = time.perf_counter()
+    _, hist = train_line_search(Xt, yt, theta0, args.gd_epochs)
+    rows.append(
+        ("line-search", None, hist.numpy(), tr_target, time.perf_counter() - t0)
+    )
+    for name in args.optimizers:
+        ds = ChunkedDataset(X_tr, y_tr, batch_size=args.batch_size, seed=0)
+        t0 = time.perf_counter()
+        _, _, hist = train_minibatch(
+            ds,
+            theta0,
+            name,
+            lr=args.lr,
+            epochs=args.epochs,
+            val=(X_val, y_val),
+            num_workers=args.workers,
+        )
+        lr = args.lr or DEFAULT_LR[name]
+        rows.append((name, lr, hist, val_target, time.perf_counter() - t0))
+
+    df = pd.DataFrame(
+        [
+            {
+                "optimizer": name,
+                "lr": lr,
+                "passes": len(hist),
+                "final_mse": hist[-1],
+                "target_mse": target,
+                "passes_to_closed_form": passes_to(hist, target),
+                "seconds": t,
+            }
+            for name, lr, hist, target, t in rows
+        ]
+    )
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.6f}"))
+
+
+def bench_gram(args):
+    datasets = {"housing": housing}
+    if args.rows:
+        datasets[f"synthetic {args.rows}x{args.cols}"] = lambda: synthetic(
+            args.rows, args.cols
+        )
+    rows = []
+    for name, load in datasets.items():
+        X, y = load()
+        theta0 = torch.zeros(X.shape[1], 1)
+        (theta_loop, hist_loop), t_loop = timed(
+            lambda: train_gd(X, y, theta0, args.alpha, args.epochs), args.repeat
+        )
+        stats, t_stats = timed(lambda: gram_stats(X, y), args.repeat)
+        (theta_gram, hist_gram), t_gram = timed(
+            lambda: train_gd_gram(stats, theta0, args.alpha, args.epochs),
+            args.repeat,
+        )
+        rows.append(
+            {
+                "data": name,
+                "loop_s": t_loop,
+                "gram_pass_s": t_stats,
+                "gram_iter_s": t_gram,
+                "speedup": t_loop / (t_stats + t_gram),
+                "max_theta_diff": (theta_loop - theta_gram).abs().max().item(),
+                "max_mse_diff": (hist_loop.double() - hist_gram).abs().max().item(),
+            }
+        )
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda x: f"{x:.3e}"))
+
+
+def bench_compile(args):
+    X, y = synthetic(args.rows, args.cols)
+    theta0 = torch.zeros(args.cols, 1)
+    rows = []
+    for mode in [None, *args.modes]:
+        # the first call pays for tracing/compilation, the rest reuse it
+        t0 = time.perf_counter()
+        train_gd(X, y, theta0, args.alpha, args.epochs, compile=mode)
+        t_first = time.perf_counter() - t0
+        (theta, _), t = timed(
+            lambda: train_gd(X, y, theta0, args.alpha, args.epochs, compile=mode),
+            args.repeat,
+        )
+        rows.append(
+            {
+                "mode": mode or "eager",
+                "first_call_s": t_first,
+                "seconds": t,
+                "theta": theta,
+            }
+        )
+    eager_s, eager_theta = rows[0]["seconds"], rows[0]["theta"]
+    for r in rows:
+        r["speedup"] = eager_s / r["seconds"]
+        r["max_theta_diff"] = (r.pop("theta") - eager_theta).abs().max().item()
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda x: f"{x:.3e}"))
+
+
+def bench_threads(args):
+    # intra-op threads can be changed between runs in one process; the
+    # inter-op pool cannot, so it is left at the default here
+    dtype = DTYPES[args.dtype]
+    X, y = synthetic(args.rows, args.cols, dtype=dtype)
+    fdt = torch.float32 if dtype == torch.bfloat16 else dtype
+    theta0 = torch.zeros(args.cols, 1, dtype=dtype)
+    default = torch.get_num_threads()
+    rows = []
+    for n in args.threads:
+        torch.set_num_threads(n)
+        _, t_gd = timed(lambda: train_gd(X, y, theta0, 0.01, args.epochs), args.repeat)
+        _, t_cf = timed(lambda: LeastSquares(X.to(fdt)).solve(y.to(fdt)), args.repeat)
+        rows.append(
+            {
+                "threads": n,
+                "gd_s": t_gd,
+                "gd_rows_per_s": args.rows * args.epochs / t_gd,
+                "closed_form_s": t_cf,
+                "closed_form_rows_per_s": args.rows / t_cf,
+            }
+        )
+    torch.set_num_threads(default)
+    df = pd.DataFrame(rows)
+    df["gd_speedup"] = df["gd_s"].iloc[0] / df["gd_s"]
+    df["closed_form_speedup"] = df["closed_form_s"].iloc[0] / df["closed_form_s"]
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.3e}"))
+
+
+def bench_corr(args):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((args.rows, args.cols)).astype(np.float32)
+    # a few planted pairs so the screen has something to find
+    X[:, 1 : args.cols : 7] += 3 * X[:, 0 : args.cols - 1 : 7]
+    names = [f"f{i}" for i in range(args.cols)]
+
+    def baseline():
+        # the previous pandas + nested-loop screen
+        corr = pd.DataFrame(X, columns=names).astype(np.float64).corr()
+        return [
+            (i, j, corr.loc[i, j])
+            for i in corr.columns
+            for j in corr.columns
+            if i < j and abs(corr.loc[i, j]) > args.threshold
+        ]
+
+    rows = []
+    if args.cols <= args.baseline_max_cols:
+        pairs, t = timed(baseline, 1)
+        rows.append({"method": "pandas + loops", "seconds": t, "pairs": len(pairs)})
+    (i, _, _), t = timed(
+        lambda: strong_pairs(correlation(X), args.threshold), args.repeat
+    )
+    rows.append({"method": "gemm + triu", "seconds": t, "pairs": len(i)})
+    (i, _, _), t = timed(
+        lambda: strong_pairs_chunked(
+            X, args.threshold, args.block_cols, args.chunk_rows
+        ),
+        args.repeat,
+    )
+    rows.append({"method": "chunked", "seconds": t, "pairs": len(i)})
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda x: f"{x:.3e}"))
+
+
+def bench_ridge(args):
+    X, y = synthetic(args.rows, args.cols, dtype=torch.float64)
+    # k correlated targets, as in a multi-output fit
+    g = torch.Generator().manual_seed(1)
+    Y = y + 0.1 * torch.randn(len(y), args.targets, generator=g, dtype=y.dtype)
+    alphas = torch.logspace(-4, 4, args.alphas, dtype=torch.float64)
+
+    _, t_one = timed(lambda: LeastSquares(X).solve(Y), args.repeat)
+
+    def loop():
+        # a fresh factorization and a residual pass over X per alpha; column
+        # 0 is the bias, so centering leaves the intercept unpenalized
+        Xc = X[:, 1:] - X[:, 1:].mean(0)
+        Yc = Y - Y.mean(0)
+        solver = LeastSquares(Xc)
+        return torch.stack(
+            [((Yc - Xc @ solver.solve(Yc, a.item())) ** 2).sum(0) for a in alphas]
+        )
+
+    rss_loop, t_loop = timed(loop, args.repeat)
+
+    def path():
+        rp = RidgePath.fit(X, Y, intercept=0)
+        return rp, rp.gcv(alphas), rp.select(alphas)
+
+    (rp, _, _), t_path = timed(path, args.repeat)
+    rows = [
+        {"method": "single fit", "seconds": t_one, "rel_to_single": 1.0},
+        {
+            "method": f"cholesky loop x{args.alphas}",
+            "seconds": t_loop,
+            "rel_to_single": t_loop / t_one,
+        },
+        {
+            "method": f"RidgePath gcv x{args.alphas}",
+            "seconds": t_path,
+            "rel_to_single": t_path / t_one,
+        },
+    ]
+    if args.loo:
+        _, t_loo = timed(lambda: rp.loo(X, Y, alphas), args.repeat)
+        rows.append(
+            {
+                "method": f"RidgePath loo x{args.alphas}",
+                "seconds": t_loo,
+                "rel_to_single": t_loo / t_one,
+            }
+        )
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda x: f"{x:.3e}"))
+    rel = ((rp.rss(alphas) - rss_loop).abs() / rss_loop).max().item()
+    print(f"max relative RSS difference vs the loop: {rel:.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="task_2 benchmarks.")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("solvers", help="closed-form solver time and accuracy")
+    p.add_argument("--methods", nargs="+", default=list(LeastSquares.METHODS))
+    p.add_argument("--rows", type=int, default=10_000_000, help="0 to skip synthetic")
+    p.add_argument("--cols", type=int, default=100)
+    p.add_argument("--targets", type=int, default=4)
+    p.add_argument("--alphas", type=float, nargs="+", default=[0.0, 0.1, 1.0, 10.0])
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_solvers)
+
+    p = sub.add_parser("optim", help="data passes needed to reach the closed form")
+    p.add_argument(
+        "--optimizers", nargs="+", default=["sgd", "momentum", "nesterov", "adam"]
+    )
+    p.add_argument(
+        "--lr", type=float, help="one step for all optimizers (default: per optimizer)"
+    )
+    p.add_argument("--batch-size", type=int, default=256)
+    p.add_argument("--epochs", type=int, default=50)
+    p.add_argument("--alpha", type=float, default=0.01, help="full-batch GD step")
+    p.add_argument("--gd-epochs", type=int, default=700)
+    p.add_argument("--rel-tol", type=float, default=1e-3)
+    p.add_argument("--workers", type=int, default=0)
+    p.add_argument("--memmap", action="store_true", help="stream X from a .npy")
+    p.set_defaults(func=bench_optim)
+
+    p = sub.add_parser("gram", help="precomputed X^T X gradient vs the data loop")
+    p.add_argument("--rows", type=int, default=1_000_000, help="0 to skip synthetic")
+    p.add_argument("--cols", type=int, default=100)
+    p.add_argument("--alpha", type=float, default=0.01)
+    p.add_argument("--epochs", type=int, default=700)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_gram)
+
+    p = sub.add_parser("compile", help="compiled GD step vs eager")
+    p.add_argument(
+        "--modes", nargs="+", choices=COMPILE_MODES, default=list(COMPILE_MODES)
+    )
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--cols", type=int, default=100)
+    p.add_argument("--alpha", type=float, default=0.01)
+    p.add_argument("--epochs", type=int, default=700)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_compile)
+
+    p = sub.add_parser("threads", help="GD and closed-form throughput vs threads")
+    p.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, 8, torch.get_num_threads()}),
+    )
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--cols", type=int, default=100)
+    p.add_argument("--epochs", type=int, default=50)
+    p.add_argument("--dtype", choices=list(DTYPES), default="float32")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_threads)
+
+    p = sub.add_parser("corr", help="strong-correlation screen on wide data")
+    p.add_argument("--rows", type=int, default=20_000)
+    p.add_argument("--cols", type=int, default=2_000)
+    p.add_argument("--threshold", type=float, default=0.75)
+    p.add_argument("--block-cols", type=int, default=512)
+    p.add_argument("--chunk-rows", type=int, default=1 << 14)
+    p.add_argument(
+        "--baseline-max-cols",
+        type=int,
+        default=500,
+        help="skip the quadratic baseline above this width",
+    )
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_corr)
+
+    p = sub.add_parser("ridge", help="multi-target ridge path and GCV/LOO")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--cols", type=int, default=100)
+    p.add_argument("--targets", type=int, default=32)
+    p.add_argument("--alphas", type=int, default=100)
+    p.add_argument("--loo", action="store_true", help="also time exact LOO")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_ridge)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+
+def column_stats(X, chunk_rows=1 << 16):
+    # mean and std per column in one pass over row chunks (arrays or
+    # np.memmap). Sums are taken around the first row in float64, so the
+    # one-pass variance does not cancel for large-offset columns.
+    n = X.shape[0]
+    shift = np.asarray(X[0], dtype=np.float64)
+    s = np.zeros_like(shift)
+    ss = np.zeros_like(shift)
+    for start in range(0, n, chunk_rows):
+        c = np.asarray(X[start : start + chunk_rows], dtype=np.float64) - shift
+        s += c.sum(axis=0)
+        ss += np.einsum("ij,ij->j", c, c)
+    mean = s / n
+    std = np.sqrt(np.maximum(ss / n - mean * mean, 0.0))
+    # constant columns correlate with nothing instead of producing NaN
+    std[std == 0] = 1.0
+    return shift + mean, std
+
+
+def _standardized(X, mean, std, dtype):
+    return ((np.asarray(X, dtype=np.float64) - mean) / std).astype(dtype)
+
+
+def correlation(X, dtype=np.float32, chunk_rows=1 << 16):
+    # Pearson matrix as Z^T Z / n on standardized data: one BLAS GEMM per
+    # row chunk (a single one when X fits in a chunk), float32 by default
+    n, d = X.shape
+    mean, std = column_stats(X, chunk_rows)
+    corr = np.zeros((d, d), dtype=dtype)
+    for start in range(0, n, chunk_rows):
+        Z = _standardized(X[start : start + chunk_rows], mean, std, dtype)
+        corr += Z.T @ Z
+    corr /= n
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr
+
+
+def strong_pairs(corr, threshold=0.75):
+    # (i, j, r) with i < j and |r| > threshold, in row-major order
+    i, j = np.triu_indices(corr.shape[0], k=1)
+    r = corr[i, j]
+    keep = np.abs(r) > threshold
+    return i[keep], j[keep], r[keep]
+
+
+def strong_pairs_chunked(
+    X, threshold=0.75, block_cols=2048, chunk_rows=1 << 16, dtype=np.float32
+):
+    # Same result as strong_pairs(correlation(X)) without the d x d matrix:
+    # each block of columns is correlated against itself and every later
+    # column in one pass over the rows, so memory is block_cols x d and X is
+    # read d / block_cols times.
+    n, d = X.shape
+    mean, std = column_stats(X, chunk_rows)
+    out_i, out_j, out_r = [], [], []
+    for b in range(0, d, block_cols):
+        e = min(b + block_cols, d)
+        block = np.zeros((e - b, d - b), dtype=dtype)
+        for start in range(0, n, chunk_rows):
+            Z = _standardized(
+                X[start : start + chunk_rows, b:], mean[b:], std[b:], dtype
+            )
+            block += Z[:, : e - b].T @ Z
+        block /= n
+        i, j = np.nonzero(np.triu(np.abs(block) > threshold, k=1))
+        out_i.append(i + b)
+        out_j.append(j + b)
+        out_r.append(np.clip(block[i, j], -1.0, 1.0))
+    i, j, r = (np.concatenate(a) for a in (out_i, out_j, out_r))
+    order = np.lexsort((j, i))
+    return i[order], j[order], r[order]
@@ -1,15 +1,22 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import argparse
+import sys
+
+from pathlib import Path
+
 import torch
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-from sklearn.datasets import fetch_california_housing
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common import datasets, models
+from common.plots import add_plot_args, render
+from backend import add_backend_args, from_args
+from correlation import correlation, strong_pairs
+from solvers import LeastSquares, RidgePath
+from train import COMPILE_MODES, train_gd
 
 
 def r2_score_manual(y_true, y_pred):
@@ -18,69 +25,22 @@ def r2_score_manual(y_true, y_pred):
     return 1 - ss_res / ss_tot
 
 
-def get_device():
-    if torch.cuda.is_available():
-        return torch.device("cuda")
-    if getattr(torch.backends, "xpu", None) and torch.xpu.is_available():
-        return torch.device("cpu")
-    if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
-        return torch.device("mps")
-    return torch.device("cpu")
-
-
-def main():
-    housing = fetch_california_housing(as_frame=True)
-    df = pd.concat([housing.data, housing.target.rename("MedHouseVal")], axis=1)
-    assert df.isnull().sum().sum() == 0
-
-    X = housing.data.values.astype(np.float32)
-    y = housing.target.values.reshape(-1, 1).astype(np.float32)
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    X_scaled = np.hstack([np.ones((X_scaled.shape[0], 1), dtype=np.float32), X_scaled])
-
-    X_tr, X_te, y_tr, y_te = train_test_split(
-        X_scaled, y, test_size=0.2, random_state=42
+def load_data(test_size=0.2, random_state=42):
+    return datasets.load(
+        "california_housing",
+        scale="all",
+        test_size=test_size,
+        random_state=random_state,
+        bias=True,
+        dtype="float32",
+        y_dtype="float32",
+        y_column=True,
     )
 
-    device = get_device()
-    X_tr_t = torch.from_numpy(X_tr).to(device)
-    y_tr_t = torch.from_numpy(y_tr).to(device)
-    X_te_t = torch.from_numpy(X_te).to(device)
-    y_te_t = torch.from_numpy(y_te).to(device)
-    m, n = X_tr_t.shape
-
-    XtX = X_tr_t.t() @ X_tr_t
-    Xty = X_tr_t.t() @ y_tr_t
-    theta_closed = torch.linalg.inv(XtX) @ Xty
-    y_tr_pred_closed = X_tr_t @ theta_closed
-    y_te_pred_closed = X_te_t @ theta_closed
-
-    mse_tr_closed = torch.mean((y_tr_t - y_tr_pred_closed) ** 2).item()
-    mse_te_closed = torch.mean((y_te_t - y_te_pred_closed) ** 2).item()
-    r2_tr_closed = r2_score_manual(y_tr_t.cpu().numpy(), y_tr_pred_closed.cpu().numpy())
-    r2_te_closed = r2_score_manual(y_te_t.cpu().numpy(), y_te_pred_closed.cpu().numpy())
-
-    alpha = 0.01
-    epochs = 700
-    theta_gd = torch.randn(n, 1, device=device)
-    mse_history = []
-    for epoch in range(1, epochs + 1):
-        preds = X_tr_t @ theta_gd
-        error = preds - y_tr_t
-        grad = (2 / m) * (X_tr_t.t() @ error)
-        theta_gd -= alpha * grad
-        mse_history.append(torch.mean(error**2).item())
-
-    y_tr_pred_gd = X_tr_t @ theta_gd
-    y_te_pred_gd = X_te_t @ theta_gd
-
-    mse_tr_gd = torch.mean((y_tr_t - y_tr_pred_gd) ** 2).item()
-    mse_te_gd = torch.mean((y_te_t - y_te_pred_gd) ** 2).item()
-    r2_tr_gd = r2_score_manual(y_tr_t.cpu().numpy(), y_tr_pred_gd.cpu().numpy())
-    r2_te_gd = r2_score_manual(y_te_t.cpu().numpy(), y_te_pred_gd.cpu().numpy())
 
-    feature_names = ["Bias"] + housing.feature_names
+def plot_results(mse_history, y_te, y_te_pred, theta, feature_names, corr):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     plt.figure(figsize=(8, 4))
     plt.plot(mse_history)
@@ -88,34 +48,125 @@ def main():
     plt.ylabel("MSE")
     plt.title("Convergence of Gradient Descent")
     plt.grid(True)
-    plt.show()
 
     plt.figure(figsize=(6, 6))
-    plt.scatter(y_te, y_te_pred_gd.cpu(), alpha=0.3)
+    plt.scatter(y_te, y_te_pred, alpha=0.3)
     plt.plot([y_te.min(), y_te.max()], [y_te.min(), y_te.max()], "--")
     plt.xlabel("Actual")
     plt.ylabel("Predicted")
     plt.title("Actual vs Predicted (Test GD)")
     plt.grid(True)
-    plt.show()
 
     plt.figure(figsize=(10, 5))
-    pd.Series(theta_gd.cpu().numpy().ravel(), index=feature_names).plot.bar()
+    plt.bar(feature_names, theta)
     plt.xticks(rotation=45)
     plt.title("Feature Coefficients (GD)")
     plt.grid(axis="y")
-    plt.show()
 
-    corr = housing.data.corr()
     plt.figure(figsize=(8, 6))
-    sns.heatmap(corr, annot=True, fmt="0.2f", cmap="coolwarm")
+    sns.heatmap(
+        corr,
+        annot=True,
+        fmt="0.2f",
+        cmap="coolwarm",
+        xticklabels=feature_names[1:],
+        yticklabels=feature_names[1:],
+    )
     plt.title("Correlation Matrix")
-    plt.show()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Linear regression on California Housing."
+    )
+    add_plot_args(parser)
+    add_backend_args(parser)
+    parser.add_argument(
+        "--compile",
+        choices=COMPILE_MODES,
+        help="compile the GD step with torch.compile or TorchScript",
+    )
+    parser.add_argument(
+        "--save-model", type=Path, help="save the GD coefficients as a .npz model"
+    )
+    return parser.parse_args()
+
+
+def main():
+    opts = parse_args()
+    backend = from_args(opts)
+    print(backend.describe())
+    ds = load_data()
+    X_tr, X_te, y_tr, y_te = ds.X_train, ds.X_test, ds.y_train, ds.y_test
+
+    device = backend.device
+    X_tr_t = backend.tensor(X_tr)
+    y_tr_t = backend.tensor(y_tr)
+    X_te_t = backend.tensor(X_te)
+    y_te_t = backend.tensor(y_te)
+    m, n = X_tr_t.shape
+
+    fdt = backend.factor_dtype
+    theta_closed = (
+        LeastSquares(X_tr_t.to(fdt), method="cholesky")
+        .solve(y_tr_t.to(fdt))
+        .to(backend.dtype)
+    )
+    y_tr_pred_closed = X_tr_t @ theta_closed
+    y_te_pred_closed = X_te_t @ theta_closed
+
+    mse_tr_closed = torch.mean((y_tr_t - y_tr_pred_closed) ** 2).item()
+    mse_te_closed = torch.mean((y_te_t - y_te_pred_closed) ** 2).item()
+    r2_tr_closed = r2_score_manual(
+        backend.numpy(y_tr_t), backend.numpy(y_tr_pred_closed)
+    )
+    r2_te_closed = r2_score_manual(
+        backend.numpy(y_te_t), backend.numpy(y_te_pred_closed)
+    )
+
+    # column 0 is the bias; centering keeps it out of the penalty
+    ridge = RidgePath.fit(X_tr, y_tr, intercept=0)
+    ridge_alpha, theta_ridge, _ = ridge.select(np.logspace(-3, 4, 100))
+    theta_ridge = theta_ridge.to(device, fdt)
+    mse_te_ridge = torch.mean((y_te_t - X_te_t.to(fdt) @ theta_ridge) ** 2).item()
+
+    alpha = 0.01
+    epochs = 700
+    theta_gd = torch.randn(n, 1, device=device, dtype=backend.dtype)
+    theta_gd, mse_history = train_gd(
+        X_tr_t, y_tr_t, theta_gd, alpha, epochs, compile=opts.compile
+    )
+
+    y_tr_pred_gd = X_tr_t @ theta_gd
+    y_te_pred_gd = X_te_t @ theta_gd
+
+    mse_tr_gd = torch.mean((y_tr_t - y_tr_pred_gd) ** 2).item()
+    mse_te_gd = torch.mean((y_te_t - y_te_pred_gd) ** 2).item()
+    r2_tr_gd = r2_score_manual(backend.numpy(y_tr_t), backend.numpy(y_tr_pred_gd))
+    r2_te_gd = r2_score_manual(backend.numpy(y_te_t), backend.numpy(y_te_pred_gd))
+
+    feature_names = ds.feature_names
+    theta_np = backend.numpy(theta_gd).ravel()
+    corr = correlation(np.vstack([X_tr, X_te])[:, 1:])
+
+    render(
+        opts,
+        plot_results,
+        backend.numpy(mse_history),
+        y_te,
+        backend.numpy(y_te_pred_gd),
+        theta_np,
+        feature_names,
+        corr,
+    )
 
     print("\n=== Результаты: Метод наименьших квадратов (МНК) ===")
     print(f"Train MSE: {mse_tr_closed:.4f} | Train R2: {r2_tr_closed:.4f}")
     print(f"Test  MSE: {mse_te_closed:.4f} | Test  R2: {r2_te_closed:.4f}\n")
 
+    print("=== Ridge (GCV по 100 alpha) ===")
+    print(f"alpha: {ridge_alpha.item():.3g} | Test  MSE: {mse_te_ridge:.4f}\n")
+
     print("=== Результаты: Градиентный спуск (GD) ===")
     print(f"Train MSE: {mse_tr_gd:.4f} | Train R2: {r2_tr_gd:.4f}")
     print(f"Test  MSE: {mse_te_gd:.4f} | Test  R2: {r2_te_gd:.4f}\n")
@@ -124,23 +175,23 @@ def main():
     print(f"Difference in Test R2 (Closed - GD): {r2_te_closed - r2_te_gd:+.4f}")
     print(f"Difference in Test MSE (GD - Closed): {mse_te_gd - mse_te_closed:+.4f}\n")
 
-    abs_coefs = pd.Series(
-        torch.abs(theta_gd).cpu().numpy().ravel(), index=feature_names
-    )
+    top = np.argsort(-np.abs(theta_np), kind="stable")[:3]
     print(
         "Топ признаки |coef| (GD):",
-        abs_coefs.sort_values(ascending=False).head(3).to_dict(),
+        {feature_names[i]: float(abs(theta_np[i])) for i in top},
     )
 
-    strong_corrs = [
-        (i, j, corr.loc[i, j])
-        for i in corr.columns
-        for j in corr.columns
-        if i < j and abs(corr.loc[i, j]) > 0.75
-    ]
+    names = feature_names[1:]
     print("\nСильные корреляции (|r|>0.75):")
-    for i, j, val in strong_corrs:
-        print(f" - {i} & {j}: {val:.2f}")
+    for a, b, val in zip(*strong_pairs(corr, 0.75)):
+        print(f" - {names[a]} & {names[b]}: {val:.2f}")
+
+    if opts.save_model:
+        theta = backend.numpy(theta_gd).astype(np.float64)
+        models.linear(theta[1:], theta[0], ds.mean, ds.scale, features=names).save(
+            opts.save_model
+        )
+        print(f"\nSaved GD model to {opts.save_model}")
 
 
 if __name__ == "__main__":
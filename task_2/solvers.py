@@ -0,0 +1,188 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import torch
+
+
+class LeastSquares:
+    # Factorizes X once; solve() then reuses it for any number of
+    # right-hand sides and ridge penalties (the penalty applies to every
+    # column of X, bias included).
+    METHODS = ("cholesky", "qr", "lstsq", "svd")
+
+    def __init__(self, X, method="cholesky"):
+        if method not in self.METHODS:
+            raise ValueError(
+                f"unknown method {method!r}, expected one of {self.METHODS}"
+            )
+        self.X = X
+        self.method = method
+        self.n_features = X.shape[1]
+        self._chol = {}
+        if method == "cholesky":
+            self.XtX = X.T @ X
+        elif method == "qr":
+            self.Q, self.R = torch.linalg.qr(X, mode="reduced")
+        elif method == "svd":
+            self.U, self.S, self.Vh = torch.linalg.svd(X, full_matrices=False)
+            # singular values below the LAPACK default rcond are treated as
+            # zero, so a rank-deficient X gets the minimum-norm solution
+            # instead of dividing by round-off
+            tol = self.S.max() * max(X.shape) * torch.finfo(X.dtype).eps
+            self.S = torch.where(self.S > tol, self.S, torch.zeros_like(self.S))
+
+    def _eye(self):
+        return torch.eye(self.n_features, dtype=self.X.dtype, device=self.X.device)
+
+    def _cholesky(self, gram, alpha):
+        # one d x d factor per penalty, cached: a ridge path costs O(d^3) per
+        # alpha, never another pass over X
+        if alpha not in self._chol:
+            self._chol[alpha] = torch.linalg.cholesky(gram + alpha * self._eye())
+        return self._chol[alpha]
+
+    def solve(self, Y, alpha=0.0):
+        vector = Y.dim() == 1
+        if vector:
+            Y = Y[:, None]
+        if self.method == "cholesky":
+            theta = torch.cholesky_solve(self.X.T @ Y, self._cholesky(self.XtX, alpha))
+        elif self.method == "qr":
+            QtY = self.Q.T @ Y
+            if alpha == 0:
+                theta = torch.linalg.solve_triangular(self.R, QtY, upper=True)
+            else:
+                # X^T X + aI = R^T R + aI, and X^T Y = R^T Q^T Y
+                L = self._cholesky(self.R.T @ self.R, alpha)
+                theta = torch.cholesky_solve(self.R.T @ QtY, L)
+        elif self.method == "svd":
+            denom = self.S**2 + alpha
+            scale = torch.where(denom > 0, self.S / denom, torch.zeros_like(denom))
+            theta = self.Vh.T @ (scale[:, None] * (self.U.T @ Y))
+        else:
+            # Not cached: torch.linalg.lstsq (gelsy/gelsd) does not expose its
+            # rank-revealing factorization, and the augmented system below
+            # changes with alpha anyway. This is the reference solver; "svd"
+            # gives the same minimum-norm answer from a reusable factor.
+            X = self.X
+            if alpha != 0:
+                X = torch.cat([X, alpha**0.5 * self._eye()])
+                Y = torch.cat([Y, Y.new_zeros(self.n_features, Y.shape[1])])
+            theta = torch.linalg.lstsq(X, Y).solution
+        return theta[:, 0] if vector else theta
+
+
+class RidgePath:
+    # Ridge for k targets and a whole grid of penalties from one symmetric
+    # eigendecomposition X^T X = V diag(lam) V^T. With z = V^T X^T Y every
+    # (alpha, target) fit is the diagonal rescaling z / (lam + alpha), and
+    # RSS, effective degrees of freedom and GCV follow in O(d k) per alpha
+    # without touching X again. Built from gram_stats(), so X may be a memmap.
+    # With intercept=j, column j of X is the constant bias column: X and Y
+    # are centered in the statistics and the intercept is left unpenalized.
+    def __init__(self, stats, intercept=None):
+        XtX, XtY, yty, self.m = stats
+        XtX, XtY = XtX.double(), XtY.double()
+        self.intercept = intercept
+        if intercept is not None:
+            # the bias row of X^T X (X^T Y) holds the column (target) sums
+            keep = [j for j in range(XtX.shape[0]) if j != intercept]
+            self.keep = keep
+            self.x_mean = XtX[intercept, keep] / self.m
+            self.y_mean = XtY[intercept] / self.m
+            XtY = XtY[keep] - self.m * self.x_mean[:, None] * self.y_mean[None]
+            XtX = XtX[keep][:, keep] - self.m * torch.outer(self.x_mean, self.x_mean)
+            yty = yty - self.m * self.y_mean**2
+        self.yty = yty
+        lam, self.V = torch.linalg.eigh(XtX)
+        # round-off can push the eigenvalues of a singular X^T X below zero
+        self.lam = lam.clamp_min(0)
+        self.z = self.V.T @ XtY
+
+    @classmethod
+    def fit(cls, X, Y, chunk_rows=1 << 16, intercept=None):
+        from train import gram_stats
+
+        stats = gram_stats(X, Y if Y.ndim == 2 else Y[:, None], chunk_rows)
+        return cls(stats, intercept)
+
+    def _with_intercept(self, theta):
+        # (..., d - 1, k) slopes -> (..., d, k) with b = y_mean - x_mean theta
+        # put back in the bias row
+        if self.intercept is None:
+            return theta
+        b = self.y_mean - (self.x_mean[:, None] * theta).sum(dim=-2)
+        i = self.intercept
+        return torch.cat([theta[..., :i, :], b[..., None, :], theta[..., i:, :]], -2)
+
+    def _inv(self, alphas):
+        # 1 / (lam + alpha) per (alpha, eigenvalue); zero where both are zero,
+        # which is the minimum-norm solution for alpha = 0
+        alphas = torch.as_tensor(alphas, dtype=torch.float64)
+        denom = self.lam[None, :] + alphas.reshape(-1, 1)
+        return torch.where(denom > 0, 1 / denom, torch.zeros_like(denom))
+
+    def coef(self, alphas):
+        # (n_alphas, d, k)
+        return self._with_intercept(self.V @ (self._inv(alphas)[:, :, None] * self.z))
+
+    def rss(self, alphas):
+        # ||Y - X theta||^2 = y^T y - sum z^2 (lam + 2a) / (lam + a)^2
+        inv = self._inv(alphas)
+        alphas = torch.as_tensor(alphas, dtype=torch.float64).reshape(-1, 1)
+        w = inv * (1 + alphas * inv)
+        return (self.yty[None, :] - w @ (self.z * self.z)).clamp_min(0)
+
+    def dof(self, alphas):
+        # the unpenalized intercept adds one full degree of freedom
+        dof = (self.lam[None, :] * self._inv(alphas)).sum(dim=1)
+        return dof + (self.intercept is not None)
+
+    def gcv(self, alphas):
+        # mean GCV error (n_alphas, k): (RSS / m) / (1 - dof / m)^2
+        shrink = 1 - self.dof(alphas) / self.m
+        return self.rss(alphas) / self.m / (shrink * shrink)[:, None]
+
+    def loo(self, X, Y, alphas, chunk_rows=1 << 16):
+        # Exact leave-one-out MSE (n_alphas, k): mean of (r_i / (1 - h_ii))^2.
+        # Needs one pass over X: with P = X V, h_ii = sum_j P_ij^2 / (lam_j + a)
+        # and the predictions are P (z / (lam + a)) for every alpha at once.
+        # With an intercept P comes from the centered X, and h_ii gains 1 / m.
+        Y = Y if Y.ndim == 2 else Y[:, None]
+        inv = self._inv(alphas)
+        C = inv[:, :, None] * self.z[None]
+        total = torch.zeros(len(inv), Y.shape[1], dtype=torch.float64)
+        for s in range(0, X.shape[0], chunk_rows):
+            Xc = torch.as_tensor(X[s : s + chunk_rows]).double()
+            Yc = torch.as_tensor(Y[s : s + chunk_rows]).double()
+            if self.intercept is not None:
+                Xc = Xc[:, self.keep] - self.x_mean
+                Yc = Yc - self.y_mean
+            P = Xc @ self.V
+            h = (P * P) @ inv.T
+            if self.intercept is not None:
+                h += 1 / self.m
+            r = (Yc[None] - P[None] @ C) / (1 - h.T)[:, :, None]
+            total += (r * r).sum(dim=1)
+        return total / self.m
+
+    def select(self, alphas, criterion="gcv", X=None, Y=None):
+        # best alpha per target and the matching (d, k) coefficients
+        alphas = torch.as_tensor(alphas, dtype=torch.float64)
+        err = self.gcv(alphas) if criterion == "gcv" else self.loo(X, Y, alphas)
+        best = err.argmin(dim=0)
+        inv = self._inv(alphas[best])
+        theta = self._with_intercept(self.V @ (inv.T * self.z))
+        return alphas[best], theta, err
+
+
+def normal_residual(X, Y, theta, chunk_size=1 << 20):
+    # ||X^T (Y - X theta)|| / ||X^T Y||, accumulated in float64 one row block
+    # at a time so it measures the solver rather than this check
+    theta = theta.double()
+    grad = torch.zeros_like(theta)
+    rhs = torch.zeros_like(theta)
+    for s in range(0, X.shape[0], chunk_size):
+        Xc, Yc = X[s : s + chunk_size].double(), Y[s : s + chunk_size].double()
+        grad += Xc.T @ (Yc - Xc @ theta)
+        rhs += Xc.T @ Yc
+    return (torch.linalg.norm(grad) / torch.linalg.norm(rhs)).item()
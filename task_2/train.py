@@ -0,0 +1,211 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import torch
+
+
+def gd_step(X, y, theta, alpha: float):
+    # loss and gradient share one residual; the loss stays a device tensor
+    error = X @ theta - y
+    loss = (error * error).mean()
+    grad = (2.0 / X.shape[0]) * (X.t() @ error)
+    return theta - alpha * grad, loss
+
+
+COMPILE_MODES = ("compile", "script")
+
+
+def make_step(step=gd_step, compile=None):
+    if compile is None:
+        return step
+    if compile == "compile":
+        return torch.compile(step, fullgraph=True)
+    if compile == "script":
+        return torch.jit.script(step)
+    raise ValueError(f"unknown compile mode: {compile}")
+
+
+def train_gd(X, y, theta, alpha=0.01, epochs=700, log_every=0, compile=None):
+    step = make_step(compile=compile)
+    # preallocated on the device: filling it never waits for the kernel,
+    # the host only syncs when it actually prints
+    history = torch.empty(epochs, dtype=X.dtype, device=X.device)
+    for epoch in range(epochs):
+        theta, loss = step(X, y, theta, alpha)
+        history[epoch] = loss
+        if log_every and (epoch + 1) % log_every == 0:
+            print(f"epoch {epoch + 1:5d}: MSE {loss.item():.6f}")
+    return theta, history
+
+
+class ChunkedDataset(torch.utils.data.IterableDataset):
+    # Yields shuffled (X, y) mini-batches from arrays that may be np.memmap:
+    # contiguous chunks are read in random order and shuffled in memory, so
+    # only one chunk per worker is resident at a time.
+    def __init__(self, X, y, batch_size=256, chunk_rows=1 << 16, shuffle=True, seed=0):
+        self.X, self.y = X, y
+        self.batch_size = batch_size
+        self.chunk_rows = chunk_rows
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __iter__(self):
+        info = torch.utils.data.get_worker_info()
+        worker, n_workers = (info.id, info.num_workers) if info else (0, 1)
+        rng = np.random.default_rng((self.seed, self.epoch, worker))
+        starts = np.arange(0, len(self.X), self.chunk_rows)
+        if self.shuffle:
+            starts = np.random.default_rng((self.seed, self.epoch)).permutation(starts)
+        for s in starts[worker::n_workers]:
+            Xc = np.asarray(self.X[s : s + self.chunk_rows])
+            yc = np.asarray(self.y[s : s + self.chunk_rows])
+            idx = rng.permutation(len(Xc)) if self.shuffle else np.arange(len(Xc))
+            for b in range(0, len(idx), self.batch_size):
+                i = idx[b : b + self.batch_size]
+                yield torch.from_numpy(Xc[i]), torch.from_numpy(yc[i])
+
+
+def mse_chunked(X, y, theta, chunk_rows=1 << 16):
+    total = torch.zeros((), dtype=torch.float64, device=theta.device)
+    for s in range(0, len(X), chunk_rows):
+        Xc = torch.as_tensor(np.asarray(X[s : s + chunk_rows]), device=theta.device)
+        yc = torch.as_tensor(np.asarray(y[s : s + chunk_rows]), device=theta.device)
+        total += ((Xc @ theta - yc) ** 2).sum(dtype=torch.float64)
+    return total.item() / len(X)
+
+
+# Per-optimizer steps for standardized features. Plain SGD tolerates a step
+# close to 1 / lambda_max of the Hessian; momentum multiplies the effective
+# step by 1 / (1 - momentum), and Adam's step is per-coordinate already.
+DEFAULT_LR = {"sgd": 0.3, "momentum": 0.03, "nesterov": 0.1, "adam": 0.01}
+
+
+def make_optimizer(name, params, lr, momentum=0.9):
+    if name == "sgd":
+        return torch.optim.SGD(params, lr=lr)
+    if name == "momentum":
+        return torch.optim.SGD(params, lr=lr, momentum=momentum)
+    if name == "nesterov":
+        return torch.optim.SGD(params, lr=lr, momentum=momentum, nesterov=True)
+    if name == "adam":
+        return torch.optim.Adam(params, lr=lr)
+    raise ValueError(f"unknown optimizer: {name}")
+
+
+def train_minibatch(
+    dataset,
+    theta,
+    optimizer="adam",
+    lr=None,
+    epochs=50,
+    val=None,
+    patience=5,
+    tol=1e-4,
+    lr_decay=0.5,
+    num_workers=0,
+    log_every=0,
+):
+    # The gradient is the analytic one, handed to torch.optim through .grad.
+    # With val=(X_val, y_val), every epoch that does not improve the
+    # validation MSE by a relative tol scales the step by lr_decay (the batch
+    # noise floor otherwise stalls above the optimum); after `patience` such
+    # epochs in a row training stops and the best theta is returned.
+    device = theta.device
+    theta = theta.detach().clone()
+    opt = make_optimizer(optimizer, [theta], lr or DEFAULT_LR.get(optimizer))
+    loader = torch.utils.data.DataLoader(
+        dataset,
+        batch_size=None,
+        num_workers=num_workers,
+        pin_memory=device.type == "cuda",
+    )
+    train_hist = torch.empty(epochs, dtype=torch.float64, device=device)
+    val_hist = []
+    best, best_theta, stale = np.inf, theta.clone(), 0
+    for epoch in range(epochs):
+        dataset.set_epoch(epoch)
+        sse = torch.zeros((), dtype=torch.float64, device=device)
+        seen = 0
+        for Xb, yb in loader:
+            Xb = Xb.to(device, non_blocking=True)
+            yb = yb.to(device, non_blocking=True)
+            error = Xb @ theta - yb
+            sse += (error * error).sum(dtype=torch.float64)
+            seen += len(Xb)
+            theta.grad = (2.0 / len(Xb)) * (Xb.t() @ error)
+            opt.step()
+        train_hist[epoch] = sse / seen
+        if log_every and (epoch + 1) % log_every == 0:
+            print(f"epoch {epoch + 1:5d}: train MSE {train_hist[epoch].item():.6f}")
+        if val is None:
+            continue
+        mse = mse_chunked(*val, theta)
+        val_hist.append(mse)
+        if mse < best * (1 - tol):
+            best, best_theta, stale = mse, theta.clone(), 0
+        else:
+            stale += 1
+            if stale >= patience:
+                break
+            for group in opt.param_groups:
+                group["lr"] *= lr_decay
+    theta.grad = None
+    if val is None:
+        return theta, train_hist, val_hist
+    # one validation entry per completed epoch, also when epochs == 0
+    return best_theta, train_hist[: len(val_hist)], val_hist
+
+
+def train_line_search(X, y, theta, epochs=100, tol=1e-8):
+    # steepest descent with the exact step for the quadratic loss:
+    # t = g.g / (2/m ||X g||^2), one extra matvec per iteration
+    m = X.shape[0]
+    history = torch.empty(epochs, dtype=X.dtype, device=X.device)
+    for epoch in range(epochs):
+        error = X @ theta - y
+        history[epoch] = (error * error).mean()
+        grad = (2.0 / m) * (X.t() @ error)
+        gg = (grad * grad).sum()
+        if gg.item() < tol:
+            return theta, history[: epoch + 1]
+        Xg = X @ grad
+        theta = theta - gg / ((2.0 / m) * (Xg * Xg).sum()) * grad
+    return theta, history
+
+
+def gram_stats(X, y, chunk_rows=1 << 16):
+    # X^T X, X^T y, y^T y and m in one pass over row chunks (tensors, arrays
+    # or np.memmap), accumulated in float64
+    d = X.shape[1]
+    XtX = torch.zeros(d, d, dtype=torch.float64)
+    Xty = torch.zeros(d, y.shape[1], dtype=torch.float64)
+    yty = torch.zeros(y.shape[1], dtype=torch.float64)
+    for s in range(0, len(X), chunk_rows):
+        Xc = torch.as_tensor(np.asarray(X[s : s + chunk_rows])).double()
+        yc = torch.as_tensor(np.asarray(y[s : s + chunk_rows])).double()
+        XtX += Xc.t() @ Xc
+        Xty += Xc.t() @ yc
+        yty += (yc * yc).sum(dim=0)
+    return XtX, Xty, yty, len(X)
+
+
+def train_gd_gram(stats, theta, alpha=0.01, epochs=700, momentum=0.0):
+    # Same iterates as train_gd (plus optional heavy-ball momentum), but
+    # every step is O(d^2): grad = 2/m (X^T X theta - X^T y) and
+    # MSE = (theta^T X^T X theta - 2 theta^T X^T y + y^T y) / m.
+    XtX, Xty, yty, m = stats
+    XtX, Xty, yty = (t.to(theta.device) for t in (XtX, Xty, yty))
+    th = theta.double()
+    velocity = torch.zeros_like(th)
+    history = torch.empty(epochs, dtype=torch.float64, device=theta.device)
+    for epoch in range(epochs):
+        A_th = XtX @ th
+        history[epoch] = ((th * A_th).sum() - 2 * (th * Xty).sum() + yty.sum()) / m
+        grad = (2.0 / m) * (A_th - Xty)
+        velocity = momentum * velocity + grad
+        th = th - alpha * velocity
+    return th.to(theta.dtype), history
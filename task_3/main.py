@@ -1,23 +1,33 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import argparse
+import sys
+
+from pathlib import Path
+
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
 
-from sklearn.datasets import load_breast_cancer
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 from sklearn.svm import SVC
-from sklearn.decomposition import PCA
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common import datasets, models
+from common.plots import add_plot_args, render
+
 
 def load_data(test_size=0.2, random_state=42):
-    data = load_breast_cancer()
-    X, y = data.data, np.where(data.target == 0, -1, 1)
-    return train_test_split(
-        X, y, test_size=test_size, random_state=random_state, stratify=y
+    # the scaler is fit on the train split only
+    ds = datasets.load(
+        "breast_cancer",
+        scale="train",
+        test_size=test_size,
+        random_state=random_state,
+        stratify=True,
+        signed_labels=True,
     )
+    return ds
 
 
 def train_builtin_svc(X_train, y_train, X_test, C):
@@ -26,7 +36,7 @@ def train_builtin_svc(X_train, y_train, X_test, C):
     return svc.predict(X_test)
 
 
-def train_custom_svm(X_train, y_train, X_test, C, lr, n_iters):
+def fit_custom_svm(X_train, y_train, C, lr, n_iters):
     n_samples, n_features = X_train.shape
     w = np.zeros(n_features)
     b = 0.0
@@ -43,6 +53,11 @@ def train_custom_svm(X_train, y_train, X_test, C, lr, n_iters):
                 grad_b = -C * yi
             w -= lr * grad_w
             b -= lr * grad_b
+    return w, b
+
+
+def train_custom_svm(X_train, y_train, X_test, C, lr, n_iters):
+    w, b = fit_custom_svm(X_train, y_train, C, lr, n_iters)
     return np.sign(np.dot(X_test, w) + b)
 
 
@@ -56,6 +71,10 @@ def evaluate(y_true, y_pred):
 
 
 def visualize_pca(X_train, y_train, X_test, y_test, C, lr, n_iters):
+    import matplotlib.pyplot as plt
+
+    from sklearn.decomposition import PCA
+
     pca = PCA(n_components=2, random_state=42)
     X_train_2d = pca.fit_transform(X_train)
     X_test_2d = pca.transform(X_test)
@@ -69,47 +88,66 @@ def visualize_pca(X_train, y_train, X_test, y_test, C, lr, n_iters):
     Z_svm = train_custom_svm(X_train_2d, y_train, grid, C, lr, n_iters).reshape(
         xx.shape
     )
+    plt.figure()
     plt.contourf(xx, yy, Z_svc, alpha=0.3)
     plt.scatter(X_test_2d[:, 0], X_test_2d[:, 1], c=y_test, edgecolors="k")
     plt.title(f"Built-in SVC (C={C}, PCA 2D)")
-    plt.show()
+    plt.figure()
     plt.contourf(xx, yy, Z_svm, alpha=0.3)
     plt.scatter(X_test_2d[:, 0], X_test_2d[:, 1], c=y_test, edgecolors="k")
     plt.title(f"Custom SVM (C={C}, PCA 2D)")
-    plt.show()
+
+
+def visualize_all(X_train, y_train, X_test, y_test, Cs, lr, n_iters):
+    for C in Cs:
+        visualize_pca(X_train, y_train, X_test, y_test, C, lr, n_iters)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Linear SVM on Breast Cancer: SGD vs sklearn SVC."
+    )
+    add_plot_args(parser)
+    parser.add_argument(
+        "--save-model",
+        type=Path,
+        help="save the custom SVM with the best test F1 as a .npz model",
+    )
+    return parser.parse_args()
 
 
 def main():
-    X_train, X_test, y_train, y_test = load_data()
-    missing_train = np.isnan(X_train).sum()
-    missing_test = np.isnan(X_test).sum()
-    if missing_train > 0 or missing_test > 0:
-        print(f"Found missing values: train={missing_train}, test={missing_test}")
-        return
-    scaler = StandardScaler().fit(X_train)
-    X_train = scaler.transform(X_train)
-    X_test = scaler.transform(X_test)
+    opts = parse_args()
+    ds = load_data()
+    X_train, X_test, y_train, y_test = ds.X_train, ds.X_test, ds.y_train, ds.y_test
     lr, n_iters = 1e-3, 1000
     Cs = [0.01, 1.0, 100.0]
     svc_results = []
     svm_results = []
+    best = None
     for C in Cs:
         y_pred_svc = train_builtin_svc(X_train, y_train, X_test, C)
-        y_pred_svm = train_custom_svm(X_train, y_train, X_test, C, lr, n_iters)
+        w, b = fit_custom_svm(X_train, y_train, C, lr, n_iters)
+        y_pred_svm = np.sign(np.dot(X_test, w) + b)
         svc_metrics = evaluate(y_test, y_pred_svc)
         svm_metrics = evaluate(y_test, y_pred_svm)
         svc_metrics["model"] = f"SVC C={C}"
         svm_metrics["model"] = f"Custom C={C}"
         svc_results.append(svc_metrics)
         svm_results.append(svm_metrics)
+        if best is None or svm_metrics["f1_score"] > best[0]:
+            best = (svm_metrics["f1_score"], C, w, b)
     df_svc = pd.DataFrame(svc_results).set_index("model")
     df_svm = pd.DataFrame(svm_results).set_index("model")
     print("\nBuilt-in SVC metrics for different C values:")
     print(df_svc.to_string(float_format=lambda x: f"{x:.4f}"))
     print("\nCustom SVM metrics for different C values:")
     print(df_svm.to_string(float_format=lambda x: f"{x:.4f}"))
-    for C in Cs:
-        visualize_pca(X_train, y_train, X_test, y_test, C, lr, n_iters)
+    if opts.save_model:
+        _, C, w, b = best
+        models.svm(w, b, ds.mean, ds.scale, C=C).save(opts.save_model)
+        print(f"\nSaved custom SVM (C={C}) to {opts.save_model}")
+    render(opts, visualize_all, X_train, y_train, X_test, y_test, Cs, lr, n_iters)
 
 
 if __name__ == "__main__":
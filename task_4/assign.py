@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+
+def _scores(X, centroids):
+    # ||x - c||^2 - ||x||^2 = ||c||^2 - 2 x.c: one GEMM in X's dtype,
+    # an (n, k) buffer instead of the (n, k, d) broadcast
+    c = centroids.astype(X.dtype, copy=False)
+    d = X @ c.T
+    d *= -2
+    d += (c**2).sum(axis=1)
+    return d
+
+
+def assign_clusters(X, centroids):
+    return _scores(X, centroids).argmin(axis=1)
+
+
+def _top_cells(X, coarse, n_probe):
+    d = _scores(X, coarse)
+    if n_probe == 1:
+        return d.argmin(axis=1)[:, None]
+    top = np.argpartition(d, n_probe - 1, axis=1)[:, :n_probe]
+    order = np.take_along_axis(d, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def kdtree_assigner(eps=0.0, leafsize=16):
+    from scipy.spatial import cKDTree
+
+    # eps > 0 returns a centroid within (1 + eps) of the true nearest one
+    def assign(X, centroids):
+        tree = cKDTree(centroids, leafsize=leafsize)
+        return tree.query(X, k=1, eps=eps)[1]
+
+    return assign
+
+
+def balltree_assigner(leafsize=16):
+    from sklearn.neighbors import BallTree
+
+    def assign(X, centroids):
+        tree = BallTree(centroids, leaf_size=leafsize)
+        return tree.query(X, k=1, return_distance=False)[:, 0]
+
+    return assign
+
+
+def ivf_assigner(n_lists=None, n_probe=4, coarse_iter=5, random_state=0):
+    # two-level search: centroids are bucketed under a small coarse codebook,
+    # each point is compared only with the centroids in its n_probe nearest
+    # buckets; n_probe == n_lists is exact
+    rng = np.random.RandomState(random_state)
+
+    def build(centroids):
+        k = centroids.shape[0]
+        # more lists than centroids would leave lists without a seed
+        n_cells = min(n_lists or max(1, int(np.sqrt(k))), k)
+        coarse = centroids[rng.choice(k, n_cells, replace=False)].copy()
+        for _ in range(coarse_iter):
+            owner = assign_clusters(centroids, coarse)
+            sums = np.zeros_like(coarse)
+            np.add.at(sums, owner, centroids)
+            counts = np.bincount(owner, minlength=n_cells)
+            hit = counts > 0
+            coarse[hit] = sums[hit] / counts[hit, None]
+        owner = assign_clusters(centroids, coarse)
+        # empty cells are dropped: a point probing only those would be left
+        # without a candidate, and every centroid has an owner, so at least
+        # one cell survives
+        used = np.flatnonzero(np.bincount(owner, minlength=n_cells))
+        members = [np.flatnonzero(owner == c) for c in used]
+        return coarse[used], members
+
+    def assign(X, centroids):
+        coarse, members = build(centroids)
+        cells = _top_cells(X, coarse, min(n_probe, len(members)))
+        labels = np.zeros(X.shape[0], dtype=np.intp)
+        best = np.full(X.shape[0], np.inf)
+        for p in range(cells.shape[1]):
+            # group the points by their p-th cell so each bucket is one GEMM
+            order = np.argsort(cells[:, p], kind="stable")
+            bounds = np.searchsorted(cells[order, p], np.arange(len(members) + 1))
+            for c, ids in enumerate(members):
+                rows = order[bounds[c] : bounds[c + 1]]
+                if rows.size == 0:
+                    continue
+                d = _scores(X[rows], centroids[ids])
+                j = d.argmin(axis=1)
+                dist = d[np.arange(rows.size), j]
+                better = dist < best[rows]
+                best[rows[better]] = dist[better]
+                labels[rows[better]] = ids[j[better]]
+        return labels
+
+    return assign
+
+
+def make_assigner(name="exact", d=None, k=None, **opts):
+    if callable(name):
+        return name
+    if name == "auto":
+        # trees only prune in a handful of dimensions; small k is one GEMM anyway
+        if k is not None and k < 256:
+            name = "exact"
+        else:
+            name = "kdtree" if d is not None and d <= 16 else "ivf"
+    if name == "exact":
+        return assign_clusters
+    if name == "kdtree":
+        return kdtree_assigner(**opts)
+    if name == "balltree":
+        return balltree_assigner(**opts)
+    if name == "ivf":
+        return ivf_assigner(**opts)
+    raise ValueError(f"unknown assignment backend: {name}")
@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from assign import assign_clusters, make_assigner
+
+
+def blobs(n, d, k, rng):
+    centers = rng.randn(k, d) * 4
+    X = centers[rng.randint(0, k, n)] + rng.randn(n, d)
+    return X.astype(np.float32), centers.astype(np.float32)
+
+
+def timed(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def bench_assign(n, d, k, backends, repeat, rng):
+    X, centroids = blobs(n, d, k, rng)
+    # perturbed centroids, as seen mid-run, so ties with the blob centres are rare
+    centroids = centroids + 0.5 * rng.randn(*centroids.shape).astype(np.float32)
+    exact, t_exact = timed(lambda: assign_clusters(X, centroids), repeat)
+    sq = ((X - centroids[exact]) ** 2).sum(dtype=np.float64)
+    rows = []
+    for name, opts in backends:
+        assign = make_assigner(name, d, k, **opts)
+        labels, t = timed(lambda: assign(X, centroids), repeat)
+        sse = ((X - centroids[labels]) ** 2).sum(dtype=np.float64)
+        rows.append(
+            {
+                "n": n,
+                "d": d,
+                "k": k,
+                "backend": name + "".join(f" {o}={v}" for o, v in opts.items()),
+                "seconds": t,
+                "speedup": t_exact / t,
+                "recall": (labels == exact).mean(),
+                "sse_excess": sse / sq - 1,
+            }
+        )
+    return rows
+
+
+def parse_backends(spec):
+    # "kdtree,ivf:n_probe=2,ivf:n_probe=8"
+    out = []
+    for item in spec.split(","):
+        name, *opts = item.split(":")
+        kw = {}
+        for o in opts:
+            key, val = o.split("=")
+            kw[key] = float(val) if "." in val else int(val)
+        out.append((name, kw))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Approximate vs exact nearest-centroid assignment."
+    )
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--ks", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument(
+        "--backends",
+        default="exact,kdtree,kdtree:eps=0.5,balltree,ivf:n_probe=1,ivf:n_probe=4,ivf:n_probe=16",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(args.seed)
+    backends = parse_backends(args.backends)
+    rows = []
+    for d in args.dims:
+        for k in args.ks:
+            rows += bench_assign(args.n, d, k, backends, args.repeat, rng)
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,32 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import argparse
+import sys
+import time
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-from collections import Counter
 
-from sklearn.datasets import load_digits
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import silhouette_score, davies_bouldin_score
-from sklearn.decomposition import PCA
 from sklearn.cluster import KMeans
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common import datasets, models
+from common.plots import add_plot_args, render
+from assign import assign_clusters, make_assigner
+from metrics import davies_bouldin, purity, silhouette_chunked
+
 
 def init_centroids(X, k, rng):
     idx = rng.choice(X.shape[0], k, replace=False)
     return X[idx].copy()
 
 
-def assign_clusters(X, centroids):
-    d = np.linalg.norm(X[:, None] - centroids[None], axis=2)
-    return d.argmin(axis=1)
-
-
 def update_centroids(X, labels, k, rng):
-    c = np.empty((k, X.shape[1]))
+    c = np.empty((k, X.shape[1]), dtype=X.dtype)
     for i in range(k):
         m = X[labels == i]
         c[i] = m.mean(axis=0) if m.size else X[rng.randint(0, X.shape[0] - 1)]
@@ -33,79 +35,179 @@ def update_centroids(X, labels, k, rng):
 
 def compute_sse(X, labels, centroids):
     diff = X - centroids[labels]
-    return (diff**2).sum()
+    # diffs stay in X's dtype, only the reduction is widened
+    return np.einsum("ij,ij->", diff, diff, dtype=np.float64)
 
 
-def kmeans_custom(X, k=10, n_init=10, max_iter=300, tol=1e-4, random_state=None):
-    master = np.random.RandomState(random_state)
-    best_sse = np.inf
-    best_labels = None
-    best_centroids = None
-    best_iter = None
-    for _ in range(n_init):
-        rng = np.random.RandomState(master.randint(0, 2**32 - 1))
-        centroids = init_centroids(X, k, rng)
-        for it in range(max_iter):
-            labels = assign_clusters(X, centroids)
-            new_centroids = update_centroids(X, labels, k, rng)
-            if np.linalg.norm(new_centroids - centroids) < tol:
-                break
-            centroids = new_centroids
+def resolve_dtype(X, dtype):
+    if dtype is not None:
+        return np.dtype(dtype)
+    dt = np.asarray(X[:0]).dtype
+    return dt if np.issubdtype(dt, np.floating) else np.dtype(np.float64)
+
+
+def iter_batches(X, batch_size, rng, dtype=None):
+    # contiguous slices in shuffled order: a memmap only pages in one batch at a time
+    starts = np.arange(0, X.shape[0], batch_size)
+    for s in starts[rng.permutation(len(starts))]:
+        yield np.asarray(X[s : s + batch_size], dtype=dtype)
+
+
+def predict_chunked(X, centroids, chunk_size=4096, assign=assign_clusters):
+    labels = np.empty(X.shape[0], dtype=np.intp)
+    sse = 0.0
+    for s in range(0, X.shape[0], chunk_size):
+        chunk = np.asarray(X[s : s + chunk_size], dtype=centroids.dtype)
+        lab = assign(chunk, centroids)
+        labels[s : s + chunk_size] = lab
+        sse += compute_sse(chunk, lab, centroids)
+    return labels, sse
+
+
+class MiniBatchKMeans:
+    def __init__(self, k=10, random_state=None, dtype=np.float64):
+        self.k = k
+        self.dtype = np.dtype(dtype)
+        self.rng = np.random.RandomState(random_state)
+        self.centroids = None
+        self.counts = np.zeros(k)
+
+    def partial_fit(self, batch):
+        batch = np.asarray(batch, dtype=self.dtype)
+        if self.centroids is None:
+            if batch.shape[0] < self.k:
+                raise ValueError(
+                    f"first batch has {batch.shape[0]} rows, need at least k={self.k}"
+                )
+            self.centroids = init_centroids(batch, self.k, self.rng)
+        labels = assign_clusters(batch, self.centroids)
+        self.batch_sse = compute_sse(batch, labels, self.centroids)
+        n_j = np.bincount(labels, minlength=self.k)
+        sums = np.zeros_like(self.centroids)
+        np.add.at(sums, labels, batch)
+        self.counts += n_j
+        hit = n_j > 0
+        # per-centroid rate 1/count: each centroid is the running mean of its points
+        self.centroids[hit] += (
+            sums[hit] - n_j[hit, None] * self.centroids[hit]
+        ) / self.counts[hit, None]
+        return self
+
+    def predict(self, X, chunk_size=4096):
+        return predict_chunked(X, self.centroids, chunk_size)[0]
+
+
+@dataclass
+class KMeansTrace:
+    sse: list = field(default_factory=list)
+    moved: list = field(default_factory=list)
+    times: dict = field(default_factory=dict)
+    stop: str = "max_iter"
+
+    @property
+    def n_iter(self):
+        return len(self.sse)
+
+    def add_time(self, phase, seconds):
+        self.times.setdefault(phase, []).append(seconds)
+
+
+def kmeans_lloyd(X, k, max_iter, tol, rng, assign):
+    trace = KMeansTrace()
+    centroids = init_centroids(X, k, rng)
+    labels = None
+    for it in range(max_iter):
+        t0 = time.perf_counter()
+        new_labels = assign(X, centroids)
+        moved = X.shape[0] if labels is None else int((new_labels != labels).sum())
+        labels = new_labels
+        t1 = time.perf_counter()
         sse = compute_sse(X, labels, centroids)
-        if sse < best_sse:
-            best_sse, best_labels, best_centroids, best_iter = (
-                sse,
-                labels,
-                centroids,
-                it + 1,
-            )
-    return best_labels, best_centroids, best_sse, best_iter
-
-
-def purity(pred, true):
-    k = pred.max() + 1
-    correct = 0
-    for i in range(k):
-        idx = pred == i
-        if idx.sum():
-            correct += Counter(true[idx]).most_common(1)[0][1]
-    return correct / len(true)
+        t2 = time.perf_counter()
+        prev_sse = trace.sse[-1] if trace.sse else np.inf
+        trace.sse.append(sse)
+        trace.moved.append(moved)
+        trace.add_time("assign", t1 - t0)
+        trace.add_time("sse", t2 - t1)
+        # labels and centroids returned together always match: either
+        # nothing moved (centroids are already the means) or we stop right
+        # after assigning to the current centroids, also when max_iter runs
+        # out (the last update would have no labels or SSE to go with it)
+        if moved == 0:
+            trace.stop = "labels"
+            break
+        if np.isfinite(prev_sse) and prev_sse - sse <= tol * prev_sse:
+            trace.stop = "sse"
+            break
+        if it == max_iter - 1:
+            break
+        centroids = update_centroids(X, labels, k, rng)
+        trace.add_time("update", time.perf_counter() - t2)
+    return labels, centroids, sse, trace
 
 
-def main():
-    digits = load_digits()
-    X = digits.data
-    y = digits.target
-    X_scaled = StandardScaler().fit_transform(X)
+def kmeans_minibatch(X, k, batch_size, max_iter, tol, rng, dtype, assign):
+    trace = KMeansTrace()
+    model = MiniBatchKMeans(k, random_state=rng.randint(0, 2**32 - 1), dtype=dtype)
+    model.centroids = init_centroids(X, k, rng).astype(dtype)
+    for _ in range(max_iter):
+        t0 = time.perf_counter()
+        epoch_sse = 0.0
+        for batch in iter_batches(X, batch_size, rng, dtype):
+            epoch_sse += model.partial_fit(batch).batch_sse
+        trace.add_time("epoch", time.perf_counter() - t0)
+        prev_sse = trace.sse[-1] if trace.sse else np.inf
+        trace.sse.append(epoch_sse)
+        # centroid steps shrink as 1/count, so stop on the epoch SSE instead
+        if prev_sse - epoch_sse < tol * prev_sse:
+            trace.stop = "sse"
+            break
+    labels, sse = predict_chunked(X, model.centroids, assign=assign)
+    return labels, model.centroids, sse, trace
 
-    lab_c, cen_c, sse_c, it_c = kmeans_custom(
-        X_scaled, k=10, n_init=10, random_state=42
-    )
 
-    km = KMeans(n_clusters=10, random_state=42, n_init=10)
-    lab_s = km.fit_predict(X_scaled)
+def kmeans_custom(
+    X,
+    k=10,
+    n_init=10,
+    max_iter=300,
+    tol=1e-4,
+    random_state=None,
+    batch_size=None,
+    dtype=None,
+    return_trace=False,
+    assign="exact",
+    assign_opts=None,
+):
+    master = np.random.RandomState(random_state)
+    dtype = resolve_dtype(X, dtype)
+    # the backend indexes the centroids, so it is rebuilt on every call;
+    # mini-batch updates keep the dense path and use it only for the final labels
+    assign = make_assigner(assign, X.shape[1], k, **(assign_opts or {}))
+    if batch_size is None:
+        X = np.asarray(X, dtype=dtype)
+    best = None
+    for _ in range(n_init):
+        rng = np.random.RandomState(master.randint(0, 2**32 - 1))
+        if batch_size is None:
+            run = kmeans_lloyd(X, k, max_iter, tol, rng, assign)
+        else:
+            run = kmeans_minibatch(X, k, batch_size, max_iter, tol, rng, dtype, assign)
+        if best is None or run[2] < best[2]:
+            best = run
+    labels, centroids, sse, trace = best
+    if return_trace:
+        return labels, centroids, sse, trace.n_iter, trace
+    return labels, centroids, sse, trace.n_iter
 
-    metrics = pd.DataFrame(
-        {
-            "SSE": [sse_c, km.inertia_],
-            "Silhouette": [
-                silhouette_score(X_scaled, lab_c),
-                silhouette_score(X_scaled, lab_s),
-            ],
-            "Davies_Bouldin": [
-                davies_bouldin_score(X_scaled, lab_c),
-                davies_bouldin_score(X_scaled, lab_s),
-            ],
-            "Purity": [purity(lab_c, y), purity(lab_s, y)],
-            "Iterations": [it_c, km.n_iter_],
-        },
-        index=["Custom", "Sklearn"],
-    )
 
-    print(metrics)
+def plot_results(X, lab_c, cen_c, lab_s, cen_s):
+    import matplotlib.pyplot as plt
+
+    from sklearn.decomposition import PCA
 
     pca = PCA(n_components=2)
-    X_pca = pca.fit_transform(X_scaled)
+    X_pca = pca.fit_transform(X)
 
     plt.figure(figsize=(7, 5))
     plt.scatter(X_pca[:, 0], X_pca[:, 1], c=lab_c, s=15)
@@ -119,8 +221,8 @@ def main():
     plt.xlabel("PCA 1")
     plt.ylabel("PCA 2")
 
-    d_c = np.linalg.norm(X_scaled - cen_c[lab_c], axis=1)
-    d_s = np.linalg.norm(X_scaled - km.cluster_centers_[lab_s], axis=1)
+    d_c = np.linalg.norm(X - cen_c[lab_c], axis=1)
+    d_s = np.linalg.norm(X - cen_s[lab_s], axis=1)
 
     plt.figure(figsize=(6, 4))
     plt.hist(d_c, bins=30)
@@ -130,7 +232,57 @@ def main():
     plt.hist(d_s, bins=30)
     plt.title("Sklearn distances")
 
-    plt.show()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="K-means clustering on digits.")
+    add_plot_args(parser)
+    parser.add_argument(
+        "--save-model", type=Path, help="save the custom centroids as a .npz model"
+    )
+    return parser.parse_args()
+
+
+def main():
+    opts = parse_args()
+    digits = datasets.load("digits", scale="all")
+    X_scaled, y = digits.X, digits.y
+
+    lab_c, cen_c, sse_c, it_c = kmeans_custom(
+        X_scaled, k=10, n_init=10, random_state=42
+    )
+
+    lab_m, cen_m, sse_m, it_m = kmeans_custom(
+        X_scaled, k=10, n_init=10, random_state=42, batch_size=256
+    )
+
+    km = KMeans(n_clusters=10, random_state=42, n_init=10)
+    lab_s = km.fit_predict(X_scaled)
+
+    metrics = pd.DataFrame(
+        {
+            "SSE": [sse_c, sse_m, km.inertia_],
+            "Silhouette": [
+                silhouette_chunked(X_scaled, lab_c),
+                silhouette_chunked(X_scaled, lab_m),
+                silhouette_chunked(X_scaled, lab_s),
+            ],
+            "Davies_Bouldin": [
+                davies_bouldin(X_scaled, lab_c, cen_c),
+                davies_bouldin(X_scaled, lab_m, cen_m),
+                davies_bouldin(X_scaled, lab_s, km.cluster_centers_),
+            ],
+            "Purity": [purity(lab_c, y), purity(lab_m, y), purity(lab_s, y)],
+            "Iterations": [it_c, it_m, km.n_iter_],
+        },
+        index=["Custom", "MiniBatch", "Sklearn"],
+    )
+
+    print(metrics)
+    if opts.save_model:
+        models.kmeans(cen_c, digits.mean, digits.scale).save(opts.save_model)
+        print(f"\nSaved custom k-means to {opts.save_model}")
+
+    render(opts, plot_results, X_scaled, lab_c, cen_c, lab_s, km.cluster_centers_)
 
 
 if __name__ == "__main__":
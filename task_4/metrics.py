@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from scipy.stats import norm
+
+
+def _sq_dists(A, B, B_sq=None):
+    # ||a||^2 - 2ab + ||b||^2, one GEMM instead of an (n, m, d) broadcast;
+    # everything after it works in place, so the (n, m) result is the only
+    # buffer of that size
+    if B_sq is None:
+        B_sq = (B**2).sum(axis=1)
+    d = A @ B.T
+    d *= -2
+    d += (A**2).sum(axis=1)[:, None]
+    d += B_sq[None]
+    return np.maximum(d, 0, out=d)
+
+
+def _silhouette_rows(X, X_sq, rows, labels, onehot, sizes):
+    d = _sq_dists(X[rows], X, X_sq)
+    np.sqrt(d, out=d)
+    mean_d = d @ onehot
+    own = labels[rows]
+    idx = np.arange(len(rows))
+    own_size = sizes[own]
+    a = mean_d[idx, own] / np.maximum(own_size - 1, 1)
+    mean_d /= sizes[None]
+    mean_d[idx, own] = np.inf
+    b = mean_d.min(axis=1)
+    s = (b - a) / np.maximum(a, b)
+    # singleton clusters score 0, as in sklearn
+    s[own_size == 1] = 0.0
+    return s
+
+
+def _prepare(X, labels):
+    X = np.asarray(X, dtype=float)
+    _, labels = np.unique(labels, return_inverse=True)
+    k = labels.max() + 1
+    if k < 2:
+        raise ValueError("silhouette is undefined for a single cluster")
+    onehot = np.zeros((len(labels), k))
+    onehot[np.arange(len(labels)), labels] = 1.0
+    sizes = onehot.sum(axis=0)
+    return X, (X**2).sum(axis=1), labels, onehot, sizes
+
+
+def silhouette_chunked(X, labels, memory_mb=256):
+    X, X_sq, labels, onehot, sizes = _prepare(X, labels)
+    n = X.shape[0]
+    # one (chunk, n) float64 distance block must fit in the budget
+    chunk = max(1, int(memory_mb * 2**20 // (8 * n)))
+    total = 0.0
+    for s in range(0, n, chunk):
+        rows = np.arange(s, min(s + chunk, n))
+        total += _silhouette_rows(X, X_sq, rows, labels, onehot, sizes).sum()
+    return total / n
+
+
+def silhouette_sampled(
+    X, labels, sample_size=2000, confidence=0.95, random_state=None, memory_mb=256
+):
+    X, X_sq, labels, onehot, sizes = _prepare(X, labels)
+    n = X.shape[0]
+    rng = np.random.RandomState(random_state)
+    rows = rng.choice(n, min(sample_size, n), replace=False)
+    chunk = max(1, int(memory_mb * 2**20 // (8 * n)))
+    s = np.concatenate(
+        [
+            _silhouette_rows(X, X_sq, rows[i : i + chunk], labels, onehot, sizes)
+            for i in range(0, len(rows), chunk)
+        ]
+    )
+    # a(i), b(i) are exact for each sampled point, so s.mean() is unbiased;
+    # the CI is the normal approximation with finite population correction
+    z = norm.ppf(0.5 + confidence / 2)
+    fpc = np.sqrt((n - len(s)) / max(n - 1, 1))
+    half = z * s.std(ddof=1) / np.sqrt(len(s)) * fpc if len(s) > 1 else np.inf
+    return s.mean(), (s.mean() - half, s.mean() + half)
+
+
+def purity(pred, true):
+    _, pred = np.unique(pred, return_inverse=True)
+    _, true = np.unique(true, return_inverse=True)
+    n_true = true.max() + 1
+    contingency = np.bincount(
+        pred * n_true + true, minlength=(pred.max() + 1) * n_true
+    ).reshape(-1, n_true)
+    return contingency.max(axis=1).sum() / len(true)
+
+
+def davies_bouldin(X, labels, centroids, chunk_size=65536):
+    k = centroids.shape[0]
+    spread = np.zeros(k)
+    for s in range(0, X.shape[0], chunk_size):
+        chunk = np.asarray(X[s : s + chunk_size], dtype=float)
+        lab = labels[s : s + chunk_size]
+        dist = np.linalg.norm(chunk - centroids[lab], axis=1)
+        spread += np.bincount(lab, weights=dist, minlength=k)
+    sizes = np.bincount(labels, minlength=k)
+    used = sizes > 0
+    spread = spread[used] / sizes[used]
+    c = centroids[used]
+    sep = np.sqrt(_sq_dists(c, c))
+    np.fill_diagonal(sep, np.inf)
+    ratio = (spread[:, None] + spread[None]) / sep
+    return ratio.max(axis=1).mean()